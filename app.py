@@ -1,240 +1,140 @@
 # Importation des bibliothèques 
 
+# Seules les dépendances communes à tous les onglets sont importées ici : chaque
+# onglet importe ses propres modules (plotly, pyarrow...) et python-docx n'est
+# chargé qu'à la génération du rapport (cf. benchmarks/bench_imports.py)
 import streamlit as st
 import pandas as pd
-import altair as alt
-import altair_saver
-import numpy as np
-import vl_convert as vlc
-import plotly.express as px
-import plotly.graph_objects as go
-import plotly.io as pio
-import unicodedata
-import matplotlib.pyplot as plt
 
-import io
-import re
-import os
-from io import BytesIO
-import tempfile
+from collections import OrderedDict
+from functools import partial
 
-from docx import Document
-from docx.shared import Inches
-from docx.shared import RGBColor
-from docx.shared import Pt
-from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
-from docx.enum.table import WD_TABLE_ALIGNMENT
-from docx.oxml.ns import qn
-
-
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table
-from reportlab.lib.styles import getSampleStyleSheet
+from site_analyzer.profilage import collecter, mesurer, tableau_mesures
+from site_analyzer.taches import FileTaches, cle_tache
 
 
 
 # Création des fonctions auxiliaires
 
-def clean_statut(x):
-    if pd.isna(x) or str(x).strip()=="":
-        return "?" 
-    x_sans_accent = unicodedata.normalize('NFKD', str(x)).encode('ASCII', 'ignore').decode('utf-8')
-    return x_sans_accent.strip().lower()
-
-def sauvegarder_fig_plotly(fig, nom_fichier):
-    
-    try:
-        # Convertir fig Plotly → PNG en mémoire
-        img_bytes = fig.to_image(format='png', width=900, height=600, scale=2)
-        image = Image.open(io.BytesIO(img_bytes))
-        
-        # Recréer une fig Matplotlib avec l'image
-        fig_mpl, ax = plt.subplots(figsize=(9, 6))
-        ax.imshow(image)
-        ax.axis('off')
-        
-        # Sauvegarder l’image temporaire
-        with tempfile.TemporaryDirectory() as tmpdirname:
-            chemin_complet = os.path.join(tmpdirname, nom_fichier)
-            fig_mpl.savefig(chemin_complet, bbox_inches='tight')
-            plt.close(fig_mpl)
-            # Copier l'image temporaire pour retour stable
-            with open(chemin_complet, "rb") as fsrc:
-                temp_path = os.path.join(tempfile.gettempdir(), nom_fichier)
-                with open(temp_path, "wb") as fdst:
-                    fdst.write(fsrc.read())
-            return temp_path
-    except Exception as e:
-        print(f"[Erreur lors de la sauvegarde de la figure : {e}]")
-        return None
-
-
-
-
-def generer_rapport_word(site,date_debut, date_fin,date_jour,
-                          df_production,img_production, df_etat, img_etat,
-                          img1_evolution,img2_evolution,inclure_prod=True,inclure_etat=True, inclure_evolution=True,
-                          inclure_synthese_prod=True,inclure_repartition_prod=True, inclure_etat_dominant=True,inclure_etat_repartition=True,inclure_prod_solaire=True,inclure_prod_source=True,logo_path=None):
-    doc = Document()
-
-    def add_text_paragraph(text,bold=False, italic=False):
-        p = doc.add_paragraph()
-        run = p.add_run(text)
-        run.font.name = 'Calibri'
-        run.bold = bold
-        run.italic = italic
-        run._element.rPr.rFonts.set(qn('w:eastAsia'), 'Calibri')
-        run.font.color.rgb = RGBColor(0, 0, 0)
-
-    def add_heading2(text):
-        p = doc.add_heading(text, level=1)
-        run = p.runs[0]
-        run.font.size = Pt(16)
-        run.font.color.rgb = RGBColor(0, 51, 102)  # bleu foncé
-
-    
-    def add_centered_plotly_image(doc, image_path, width_in_inches=5):
-        p = doc.add_paragraph()
-        p.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-        run = p.add_run()
-        if not image_path or not os.path.exists(image_path):
-            run.add_text("[Erreur: figure absente]")
-            return
-        try:
-            run.add_picture(image_path, width=Inches(width_in_inches))
-        except Exception as e:
-            run.add_text(f"[Erreur: impossible d’ajouter le graphique – {e}]")
-                
-    def add_table_from_df(df, afficher_index=True):
-        df = df.copy()
-        if afficher_index:
-        
-            if df.index.name is None:
-                df.index.name = ""
-            df_reset = df.reset_index()
+@st.cache_resource(max_entries=8, show_spinner=False)
+def donnees_site(cle):
+    # DataFrame relu depuis le cache disque et partagé entre les sessions (lecture seule) :
+    # la session ne conserve que la clé du cache
+    from site_analyzer.cache import lire_cache
+
+    df = lire_cache(cle)
+    if df is None:
+        raise FileNotFoundError(f"Entrée de cache introuvable : {cle}")
+    return df
+
+@st.cache_resource(show_spinner=False)
+def registre_agregats():
+    # Agrégats horaires / journaliers par clé de cache, partagés entre les sessions.
+    # Registre explicite (et non un cache par argument) pour pouvoir y déposer
+    # les agrégats mis à jour lors d'un import incrémental
+    return OrderedDict()
+
+def agregats_site(cle, agregats=None):
+    from site_analyzer.agregation import construire_agregats
+
+    registre = registre_agregats()
+    if agregats is None:
+        agregats = registre.get(cle)
+    if agregats is None:
+        # Calculés une seule fois par fichier chargé
+        agregats = construire_agregats(donnees_site(cle))
+    registre[cle] = agregats
+    registre.move_to_end(cle)
+    while len(registre) > 8:
+        registre.popitem(last=False)
+    return agregats
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def periode_historique(site, date_debut, date_fin):
+    # Seuls les mois de la période sont lus depuis l'historique local
+    from site_analyzer.agregation import construire_agregats
+    from site_analyzer.stockage import lire_historique
+
+    df = lire_historique(site, date_debut, date_fin)
+    return df, construire_agregats(df)
+
+# Taille maximale (Mo) des séries rééchantillonnées gardées en mémoire
+TAILLE_MAX_SERIES_MO = 256
+
+@st.cache_resource(show_spinner=False)
+def registre_series():
+    # Séries rééchantillonnées par (jeu de données, résolution), partagées entre les sessions
+    # et bornées en taille : la série à 10 min de plusieurs années pèse des dizaines de Mo
+    return OrderedDict()
+
+def serie_resolution(origine, date_debut, date_fin, resolution):
+    # Série de la période à une résolution donnée : origine = ("fichier", clé du cache)
+    # ou ("historique", site). Un fichier est rééchantillonné une fois en entier puis
+    # découpé par période ; l'historique n'est lu que sur la période demandée
+    from site_analyzer.agregation import decouper_periode
+    from site_analyzer.resolutions import decouper_serie, reechantillonner
+
+    if origine[0] == "historique":
+        df = periode_historique(origine[1], date_debut, date_fin)[0]
+        cle = (origine, date_debut, date_fin, resolution)
+    else:
+        df = donnees_site(origine[1])
+        cle = (origine, resolution)
+
+    registre = registre_series()
+    serie = registre.get(cle)
+    if serie is None:
+        serie = reechantillonner(df, resolution)
+    registre[cle] = serie
+    registre.move_to_end(cle)
+    # Éviction des séries les moins récemment utilisées au-delà de la taille maximale
+    taille_max = TAILLE_MAX_SERIES_MO * 1024 ** 2
+    while len(registre) > 1 and sum(s.memory_usage().sum() for s in registre.values()) > taille_max:
+        registre.popitem(last=False)
+
+    if origine[0] == "historique":
+        return serie
+    return decouper_serie(serie, decouper_periode(df, date_debut, date_fin), resolution)
+
+@st.cache_resource(show_spinner=False)
+def file_rapports():
+    # Pool de génération des rapports partagé entre les sessions
+    return FileTaches(max_workers=2)
+
+@st.fragment(run_every=1)
+def suivi_rapport(cle):
+    # Rafraîchi chaque seconde tant que le rapport est en cours, sans réexécuter le reste
+    # de la page ; une fois la tâche finie, la page est réexécutée une seule fois
+    # pour afficher le résultat hors du fragment
+    tache = file_rapports().tache(cle)
+    if tache is None or tache.finie:
+        st.rerun()
+    st.progress(tache.progression, text=f"⏳ Rapport {tache.description} : {tache.etape or 'en attente'}…")
+
+def afficher_rapport(cle, nom_fichier, mesures):
+    # Suivi d'un rapport en cours, ou son résultat (les étapes mesurées rejoignent le diagnostic)
+    tache = file_rapports().tache(cle)
+    if tache is None:
+        st.session_state.tache_rapport = None
+    elif not tache.finie:
+        suivi_rapport(cle)
+    else:
+        mesures.extend(tache.mesures)
+        if tache.etat == "erreur":
+            st.error(f"❌ Erreur lors de la génération du rapport : {tache.erreur}")
+        elif tache.resultat is None:
+            st.warning("⚠️ Aucune donnée sur la période : rapport non généré.")
         else:
-            df_reset = df
-
-        cols = len(df_reset.columns)
-        table = doc.add_table(rows=1, cols=cols)
-        table.style = 'Table Grid'
-        table.alignment = WD_TABLE_ALIGNMENT.CENTER
-        table.autofit = True
-
-        for row in table.rows:
-            for cell in row.cells:
-                cell.width = Inches(1.75)
-
-       
-
-
-        # Entête
-        hdr_cells = table.rows[0].cells
-        for i, col in enumerate(df_reset.columns):
-            paragraph = hdr_cells[i].paragraphs[0]
-            paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-            paragraph.style = doc.styles['Normal']
-            run = paragraph.add_run(str(col))
-            run.font.name = 'Calibri'
-            run._element.rPr.rFonts.set(qn('w:eastAsia'), 'Calibri')
-            run.font.size = Pt(10)
-
-        # Données
-        for _, row in df_reset.iterrows():
-            row_cells = table.add_row().cells
-            for i, item in enumerate(row):
-                paragraph = row_cells[i].paragraphs[0]
-                paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-                paragraph.style = doc.styles['Normal']
-                run = paragraph.add_run(str(item) if pd.notna(item) else "—")
-                run.font.name = 'Calibri'
-                run._element.rPr.rFonts.set(qn('w:eastAsia'), 'Calibri')
-                run.font.size = Pt(10)
+            st.success(f"✅ Rapport {tache.description} prêt.")
+            st.download_button("📥 Télécharger le rapport", tache.resultat, file_name=nom_fichier)
 
-    
-    # Logo en haut de page
-    if logo_path:
-        p_logo = doc.add_paragraph()
-        p_logo.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-        run_logo = p_logo.add_run()
-        run_logo.add_picture(logo_path, width=Inches(1))
-    
-    # Titre principal
-    titre = doc.add_heading(f"Rapport d'analyse {site}", 0)
-    titre.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-    run = titre.runs[0]
-    run.font.color.rgb = RGBColor(0, 0, 0)
-    run.font.bold = True
-
-    # Infos générales
-    add_text_paragraph(f"Période analysée : {date_debut} → {date_fin}")
-
-    # ========================
-    # 1 - PRODUCTION ENERGETIQUE
-    # ========================
-    if inclure_prod :
-        add_heading2("Production énergétique")
-     
-
-        if inclure_synthese_prod :
-            # Tableau de production
-            add_text_paragraph("Synthèse de production par source",bold=True)
-            add_table_from_df(df_production,afficher_index=True)
-
-        if inclure_repartition_prod :
-            doc.add_paragraph()
-            # Graphe camembert
-            add_text_paragraph("Répartition de la production par source",bold=True)
-            add_centered_plotly_image(doc,img_production)
-        
-        doc.add_page_break()
+@st.cache_resource(max_entries=4, show_spinner=False)
+def donnees_flotte(cles_sites):
+    # Données de tous les sites de la flotte, indexées par (site, datetime)
+    from site_analyzer.flotte import assembler_flotte
 
-    # ========================
-    # 2 - ETAT DE FONCTIONNEMENT
-    # ========================
+    return assembler_flotte(dict(cles_sites))
 
-    if inclure_etat :
-        add_heading2("État de fonctionnement")
-    
-
-        if inclure_etat_dominant:
-            # Tableau état dominant par source
-            add_text_paragraph("État dominant par source",bold=True)
-            add_table_from_df(df_etat,afficher_index=False)
-
-        if inclure_etat_repartition :
-            doc.add_paragraph()
-            # Graphe camembert
-            add_text_paragraph("Répartition de l’état de l’installation globale",bold=True)
-            add_centered_plotly_image(doc,img_etat)
-        doc.add_page_break()
-
-    # ========================
-    # 3 - EVOLUTION TEMPORELLE
-    # ========================
-
-    if inclure_evolution :
-        
-        add_heading2("Évolution temporelle")
-     
-
-        if inclure_prod_solaire:
-
-            # Graphique production réelle vs théorique
-            add_text_paragraph("Production solaire réelle vs théorique (Energie)",bold=True)
-            add_centered_plotly_image(doc,img1_evolution)
-
-        if inclure_prod_source :
-            doc.add_paragraph()
-            # Graphique production quotidienne par source
-            add_text_paragraph("Production quotidienne par source (Puissance)",bold=True)
-            add_text_paragraph(f"Résultat du {date_jour}",italic=True)
-            add_centered_plotly_image(doc,img2_evolution)
-
-    temp_path = tempfile.NamedTemporaryFile(delete=False, suffix=".docx")
-    doc.save(temp_path.name)
-    return temp_path.name
-    
 
 
 # Configuration de l'affichage outil
@@ -249,19 +149,31 @@ st.set_page_config(
 # Initialisation des variables
 if "site_name" not in st.session_state:
     st.session_state.site_name = ""
-if "fichier_donnees" not in st.session_state:
-    st.session_state.fichier_donnees = None
-if "df_donnees" not in st.session_state:
-    st.session_state.df_donnees = None
+if "cle_donnees" not in st.session_state:
+    st.session_state.cle_donnees = None
+if "cles_flotte" not in st.session_state:
+    st.session_state.cles_flotte = None
+if "tache_rapport" not in st.session_state:
+    st.session_state.tache_rapport = None
 
 
 
 # Barre latérale pour la navigation
 onglet = st.sidebar.radio(
     "",
-    ["💡 Indications", "📁 Chargement de données", "📊 Analyse & Visualisation"]
+    ["💡 Indications", "📁 Chargement de données", "📊 Analyse & Visualisation", "🏭 Flotte de sites"]
 )
 
+# Mesures des étapes (durée, lignes, pic mémoire) affichées en bas de page
+diagnostic = st.sidebar.checkbox("🛠️ Mode diagnostic", value=False)
+
+
+def afficher_mesures(mesures):
+    if diagnostic and mesures:
+        with st.expander("🛠️ Diagnostic des performances", expanded=True):
+            st.dataframe(tableau_mesures(mesures).style.format(precision=3, na_rep="—"),
+                         use_container_width=True)
+
 
 
 # Onglet 1 
@@ -320,6 +232,11 @@ if onglet == "💡 Indications":
 
 # Onglet 2 
 elif onglet == "📁 Chargement de données":
+    from site_analyzer.agregation import mettre_a_jour_agregats
+    from site_analyzer.chargement import FormatFichierError
+    from site_analyzer.incremental import charger_incremental
+    from site_analyzer.stockage import enregistrer_site
+
     st.title("📁 Chargement de données")
 
     # 1. Entrée du nom du site
@@ -331,6 +248,8 @@ elif onglet == "📁 Chargement de données":
     # 2. Upload du fichier unique
     fichier = st.file_uploader("📄 Importer le fichier de données (CSV ou Excel)", type=["csv", "xlsx"])
 
+    enregistrer = st.checkbox("Enregistrer dans l’historique local du site", value=True)
+
     st.write("")
     st.write("")
 
@@ -340,68 +259,91 @@ elif onglet == "📁 Chargement de données":
         if fichier is None:
             st.error("❌ Aucun fichier n’a été importé.")
         else:
+            mesures = []
             try:
-                if fichier.name.endswith(".csv"):
-                    df = pd.read_csv(fichier)
-                else:
-                    df = pd.read_excel(fichier)
-
-                if df.shape[1] != 15:
-                    st.error(f"❌ Le fichier contient {df.shape[1]} colonnes au lieu de 15.")
-                else:
-                    # Sauvegarde en session
-                    st.session_state.fichier_donnees = fichier
-                    st.session_state.df_donnees = df
-                    st.success(f"✅ Données du site {site_name} chargées avec succès ({df.shape[0]} lignes, 15 colonnes).")
-
+                with collecter(memoire=diagnostic) as mesures:
+                    # Lecture + nettoyage, sauf si ce fichier est déjà dans le cache disque ;
+                    # un fichier qui prolonge le précédent import du site n'est traité que pour ses nouvelles lignes
+                    with mesurer("chargement") as mesure:
+                        resultat = charger_incremental(site_name, fichier.getvalue())
+                        cle = resultat.cle
+                        df = donnees_site(cle)
+                        mesure.lignes = len(df)
+
+                    with mesurer("agregats", lignes=len(df)):
+                        # Mise à jour des agrégats de l'import précédent s'ils sont encore en mémoire ;
+                        # sinon (entrée évincée du cache disque, application redémarrée) : calcul
+                        # complet sur les nouvelles données
+                        anciens = registre_agregats().get(resultat.ancienne_cle)
+                        if resultat.mode == "ajout" and anciens is not None:
+                            agregats_site(cle, mettre_a_jour_agregats(anciens, resultat.nouvelles_lignes))
+                        else:
+                            agregats_site(cle)
+
+                    # Historique local : seuls les mois touchés sont réécrits
+                    if enregistrer and site_name:
+                        with mesurer("historique"):
+                            enregistrer_site(site_name, resultat.nouvelles_lignes if resultat.mode == "ajout" else df)
+                            periode_historique.clear()
+                            registre_series().clear()
+
+                # Sauvegarde en session (référence vers le cache, pas de copie des données)
+                st.session_state.cle_donnees = cle
+                st.success(f"✅ Données du site {site_name} chargées avec succès ({df.shape[0]} lignes, 15 colonnes).")
+                if resultat.mode == "ajout":
+                    st.info(f"ℹ️ Import incrémental : {len(resultat.nouvelles_lignes)} nouvelles lignes traitées.")
+
+            except FormatFichierError as e:
+                st.error(f"❌ {e}")
             except Exception as e:
                 st.error(f"❌ Erreur lors de la lecture du fichier : {e}")
 
+            afficher_mesures(mesures)
+
 # Onglet 3
 elif onglet == "📊 Analyse & Visualisation":
-    st.title(f"📊 Analyse & Visualisation {st.session_state.site_name}")
+    from site_analyzer.agregation import (
+        calculer_synthese, decouper_jour, decouper_periode, selection_heures, selection_jours
+    )
+    from site_analyzer.figures import (
+        figure_energie_resolution, figure_energie_solaire, figure_puissance_jour, figure_puissance_periode,
+        figure_puissance_resolution, figure_repartition_etat, figure_repartition_production
+    )
+    from site_analyzer.evenements import detecter_evenements, synthese_evenements, tableau_evenements
+    from site_analyzer.qualite import controler_qualite
+    from site_analyzer.resolutions import RESOLUTIONS, resolution_par_defaut
+    from site_analyzer.statuts import (
+        etats_dominants_par_tranche, matrice_depuis_agregats, tableau_durees_etats, tableau_etat_dominant
+    )
+    from site_analyzer.stockage import bornes_site, sites_historique, version_historique
+
+    titre = st.empty()
+
+    # Source : fichier importé dans l'onglet précédent, ou historique local d'un site
+    sites_stockes = sites_historique()
+    source = "Fichier importé"
+    if sites_stockes:
+        source = st.radio("**Source des données**", ["Fichier importé", "Historique local"], horizontal=True)
+
+    site = st.session_state.site_name
+    df = None
+    bornes = None
+    if source == "Historique local":
+        site = st.selectbox("**Site**", sites_stockes)
+        bornes = bornes_site(site)
+    elif st.session_state.cle_donnees is not None:
+        try:
+            # Données déjà nettoyées au chargement (cf. charger_incremental)
+            df = donnees_site(st.session_state.cle_donnees)
+            bornes = (df.index.min(), df.index.max())
+        except FileNotFoundError:
+            st.session_state.cle_donnees = None
+
+    titre.title(f"📊 Analyse & Visualisation {site}")
 
-    if st.session_state.df_donnees is None:
+    if bornes is None:
         st.warning("⚠️ Aucune donnée chargée. Veuillez d’abord importer un fichier dans l’onglet précédent.")
     else:
-        df = st.session_state.df_donnees.copy()
-
-        #-----------------------
-        # NETTOYAGE DE DONNEES
-        #-----------------------
-
-        # 1. Renommage des colonnes
-        df.columns = [
-            'date', 'heure',
-            'puissance_grid', 'puissance_ge', 'puissance_solaire', 'puissance_conso',
-            'energie_grid', 'energie_ge', 'energie_solaire', 'energie_solaire_theorique',
-            'energie_conso',
-            'statut_grid', 'statut_ge', 'statut_solaire', 'statut_installation'
-        ]
-
-        # 2. Création d'une colonne datetime (fusion date + heure)
-        df['datetime'] = pd.to_datetime(df['date'] + ' ' + df['heure'], format='%Y-%m-%d %H:%M:%S')
-
-        # 3. Conversion des colonnes numériques en float
-        cols_numeriques = [
-            'puissance_grid', 'puissance_ge', 'puissance_solaire', 'puissance_conso',
-            'energie_grid', 'energie_ge', 'energie_solaire', 'energie_solaire_theorique',
-            'energie_conso'
-        ]
-
-        for col in cols_numeriques:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-
-        # 4. Nettoyage des colonnes de statut
-        cols_statut = ['statut_grid', 'statut_ge', 'statut_solaire', 'statut_installation']
-
-        for col in cols_statut:
-            df[col] = df[col].apply(clean_statut)
-
-        # 5. Réorganisation des colonnes : mettre datetime en premier
-        colonnes_ordre = ['datetime'] + [col for col in df.columns if col != 'datetime']
-        df = df[colonnes_ordre]
-        df = df.sort_values("datetime").reset_index(drop=True)
 
         #-----------------------
         # TRAITEMENT DE DONNEES
@@ -416,8 +358,8 @@ elif onglet == "📊 Analyse & Visualisation":
 
         st.write("*Pour une analyse sur un jour, sélectionnez la **même date** en début et fin.*")
 
-        min_date = df["datetime"].min().date()
-        max_date = df["datetime"].max().date()
+        min_date = bornes[0].date()
+        max_date = bornes[1].date()
 
         col1, col2 = st.columns(2)
         with col1:
@@ -429,7 +371,33 @@ elif onglet == "📊 Analyse & Visualisation":
             st.error("❌ La date de fin doit être supérieure ou égale à la date de début.")
             st.stop()
         
-        df_data= df[(df["datetime"].dt.date >= date_debut) & (df["datetime"].dt.date <= date_fin)]
+        # Chaque étape de la page est chronométrée (cf. mode diagnostic)
+        mesures = []
+        etape = partial(mesurer, mesures=mesures, memoire=diagnostic)
+
+        with etape("filtre_periode") as mesure:
+            if source == "Historique local":
+                # Lecture de la seule période demandée (filtre appliqué aux fichiers Parquet)
+                df, agregats = periode_historique(site, date_debut, date_fin)
+                df_data = df
+            else:
+                # Index trié : découpage de la période par recherche dichotomique (vue, sans copie)
+                df_data = decouper_periode(df, date_debut, date_fin)
+                agregats = agregats_site(st.session_state.cle_donnees)
+            mesure.lignes = len(df_data)
+
+        # Agrégats de la période (quelques centaines de lignes journalières)
+        jours_periode = selection_jours(agregats.jours, date_debut, date_fin)
+        statuts_periode = selection_jours(agregats.statuts_jours, date_debut, date_fin)
+        heures_periode = selection_heures(agregats.heures, date_debut, date_fin)
+
+        # Contrôle qualité de la période (grille temporelle, valeurs, statuts)
+        with etape("qualite", lignes=len(df_data)):
+            qualite = controler_qualite(df_data, agregats.pas_minutes, date_debut,
+                                        pd.Timestamp(date_fin) + pd.Timedelta(days=1))
+        if qualite.manquants:
+            st.warning(f"⚠️ {qualite.manquants} horodatages manquants sur la période (couverture {qualite.couverture:.1f} %) : "
+                       "heures de marche et énergies ne portent que sur les lignes présentes (cf. Qualité des données).")
 
         
         st.write("")
@@ -446,62 +414,12 @@ elif onglet == "📊 Analyse & Visualisation":
 
         st.markdown("**🔍Synthèse de production par source**")
 
-        # Calcul des données utiles
-        pic_grid = df_data["puissance_grid"].max()
-        pic_ge = df_data["puissance_ge"].max()
-        pic_solaire = df_data["puissance_solaire"].max()
-        pic_total = df_data["puissance_conso"].max()
-
-        energie_grid = df_data["energie_grid"].sum()
-        energie_ge = df_data["energie_ge"].sum()
-        energie_solaire = df_data["energie_solaire"].sum()
-        energie_solaire_theo = df_data["energie_solaire_theorique"].sum()
-        energie_totale = df_data["energie_conso"].sum()
-
-        pertes_solaire = energie_solaire_theo - energie_solaire
-
-        pas_min = 10
-        h_marche_grid = df_data[df_data["puissance_grid"] > 0].shape[0] * pas_min / 60
-        h_marche_ge = df_data[df_data["puissance_ge"] > 0].shape[0] * pas_min / 60
-        h_marche_solaire = df_data[df_data["puissance_solaire"] > 0].shape[0] * pas_min / 60
-
-        # Tableau croisé de synthèse
-        tableau1 = pd.DataFrame({
-            "Grid": [
-                round(pic_grid, 2),
-                round(h_marche_grid, 2),
-                round(energie_grid, 2),
-                None,
-                None
-            ],
-            "GE": [
-                round(pic_ge, 2),
-                round(h_marche_ge, 2),
-                round(energie_ge, 2),
-                None,
-                None
-            ],
-            "Solaire": [
-                round(pic_solaire, 2),
-                round(h_marche_solaire, 2),
-                round(energie_solaire, 2),
-                round(energie_solaire_theo, 2),
-                round(pertes_solaire, 2)
-            ],
-            "Installation globale": [
-                round(pic_total, 2),
-                None,
-                round(energie_totale, 2),
-                None,
-                None
-            ]
-        }, index=[
-            "Pic de puissance (kW)",
-            "Heures de marche (h)",
-            "Énergie réelle produite (kWh)",
-            "Énergie théorique produite (kWh)",
-            "Pertes énergétiques (kWh)"
-        ])
+        # Calcul des KPIs à partir des agrégats journaliers (un seul passage)
+        with etape("kpi", lignes=len(jours_periode)):
+            synthese = calculer_synthese(jours_periode, agregats.pas_minutes)
+
+            # Tableau croisé de synthèse
+            tableau1 = synthese.tableau()
 
         st.dataframe(tableau1.style.format(na_rep="—"), use_container_width=True)
 
@@ -512,20 +430,8 @@ elif onglet == "📊 Analyse & Visualisation":
 
         st.markdown("**🔍 Répartition de la production totale**")
 
-        # Création des données pour le camembert
-        labels = ["Grid", "GE", "Solaire"]
-        values = [energie_grid, energie_ge, energie_solaire]
-        colors = ["#8B2A03", "#003366", "#FFA500"]  
-
-        # Création du graphique avec Plotly
-        fig = go.Figure(data=[go.Pie(
-        labels=labels,
-        values=values,
-        marker=dict(colors=colors),
-        )])
-        
-        # Affichage du graphique
-        fig.update_layout(title_text="")
+        with etape("figure_production"):
+            fig = figure_repartition_production(synthese)
         st.plotly_chart(fig, use_container_width=True)
 
         st.write("")
@@ -541,75 +447,60 @@ elif onglet == "📊 Analyse & Visualisation":
         # >>>> Etat dominant par source
         st.markdown("**🔍 État dominant par source**")
 
-        # Normalisation des statuts 
-        df_data["statut_solaire"] = df_data["statut_solaire"].replace("mauvaise", "mauvais")
-
-        # Remplacer les valeurs manquantes par 'absence de données'
-        df_data["statut_grid"] = df_data["statut_grid"].fillna("?")
-        df_data["statut_ge"] = df_data["statut_ge"].fillna("?")
-        df_data["statut_solaire"] = df_data["statut_solaire"].fillna("?")
-        df_data["statut_installation"] = df_data["statut_installation"].fillna("?")
-
-        # Définition d'une fonction qui trouve la valeur la plus fréquente
-        def statut_dominant(colonne, ignorer_eteint=False):
-            serie = df_data[colonne]
-            
-            if ignorer_eteint and colonne == "statut_ge":
-                serie = serie[serie != "eteint"]
-            
-            mode_val = serie.mode()
-            return mode_val.iloc[0] if not mode_val.empty else "?"
-
-        etat_dominant = {
-            "Grid": statut_dominant("statut_grid"),
-            "GE": statut_dominant("statut_ge",ignorer_eteint=True),
-            "Solaire": statut_dominant("statut_solaire"),
-            "Installation globale": statut_dominant("statut_installation")
-        }
-
-        # Création du DataFrame pour l'affichage
-        df_etat_dominant = pd.DataFrame(etat_dominant, index=["Statut dominant"]).T.reset_index()
-        df_etat_dominant.columns = ["Source", "Statut dominant"]
+        # Matrice statut × source de la période, à partir des agrégats journaliers
+        with etape("etat_dominant", lignes=len(statuts_periode)):
+            matrice_statuts = matrice_depuis_agregats(statuts_periode)
+            df_etat_dominant = tableau_etat_dominant(matrice_statuts)
 
         # Affichage du tableau
         st.dataframe(df_etat_dominant, use_container_width=True, hide_index=True)
 
+        # État dominant de chaque jour, lu sur les agrégats journaliers
+        with st.expander("État dominant par jour"):
+            with etape("etat_dominant_jours", lignes=len(statuts_periode)):
+                dominants_jours = etats_dominants_par_tranche(statuts_periode)
+            dominants_jours.index = dominants_jours.index.strftime("%Y-%m-%d")
+            st.dataframe(dominants_jours.rename_axis("Jour"), use_container_width=True)
+
+        st.write("")
+        st.write("")
+
+        # >>>> Temps passé dans chaque état
+        st.markdown("**🔍 Temps passé dans chaque état (h et %)**")
+
+        durees = tableau_durees_etats(matrice_statuts, agregats.pas_minutes)
+        st.dataframe(durees.style.format("{:.1f}", na_rep="—"), use_container_width=True)
+
         st.write("")
         st.write("")
         
         # >>>> Répartition de l'état de l’installation globale
         st.markdown("**🔍 Répartition de l’état de l’installation globale**")
 
-        # Comptage des occurrences
-        repartition_etat = df_data["statut_installation"].value_counts().reset_index()
-        repartition_etat.columns = ["Statut", "Nombre"]
- 
-        # Personnalisation des couleurs personnalisées 
-        couleurs_etats = {
-            "panne nea": "#D62728",           
-            "ecretage client": "#0F58DF",     
-            "ras": "#2CA02C",                 
-            "?": "#B0B0B0"   
-        }
-
-        # Association d' une couleur à chaque statut présent
-        repartition_etat["Couleur"] = repartition_etat["Statut"].map(couleurs_etats)
-
-        # Création du camembert 
-        fig_etat = go.Figure(
-            data=[
-                go.Pie(
-                    labels=repartition_etat["Statut"],
-                    values=repartition_etat["Nombre"],
-                    marker=dict(colors=repartition_etat["Couleur"]),
-                    textinfo="percent"
-                )
-            ]
-        )
+        with etape("figure_etat"):
+            fig_etat = figure_repartition_etat(matrice_statuts["Installation globale"])
 
         # Affichage du graphique
         st.plotly_chart(fig_etat, use_container_width=True)
 
+        st.write("")
+        st.write("")
+
+        # >>>> Episodes de panne, d'écrêtage et de sous-régime
+        st.markdown("**🔍 Événements détectés**")
+
+        with etape("evenements", lignes=len(df_data)):
+            evenements = detecter_evenements(df_data, agregats.pas_minutes)
+
+        if evenements.empty:
+            st.info("ℹ️ Aucun événement sur la période.")
+        else:
+            st.dataframe(synthese_evenements(evenements), use_container_width=True)
+            types_choisis = st.multiselect("Types d’événements", list(evenements["type"].unique()),
+                                           default=list(evenements["type"].unique()))
+            st.dataframe(tableau_evenements(evenements[evenements["type"].isin(types_choisis)]),
+                         use_container_width=True, hide_index=True)
+
 
         st.write("")
         st.write("")
@@ -621,47 +512,48 @@ elif onglet == "📊 Analyse & Visualisation":
         
         st.write("")
 
+        # Résolution des courbes : chaque résolution est calculée une fois par jeu de données
+        # et période, le changement de résolution est donc immédiat
+        choix_resolution = ["Profil horaire", *RESOLUTIONS]
+        resolution = st.radio(
+            "**Résolution**", choix_resolution, horizontal=True,
+            index=choix_resolution.index(resolution_par_defaut(date_debut, date_fin))
+        )
+        if source == "Historique local":
+            origine = ("historique", site)
+        else:
+            origine = ("fichier", st.session_state.cle_donnees)
+        serie = None
+        if resolution != "Profil horaire":
+            with etape("reechantillonnage", lignes=len(df_data)):
+                serie = serie_resolution(origine, date_debut, date_fin, resolution)
+
         # >>>> Production solaire réelle vs théoriquee 
         st.markdown("**🔍 Production solaire réelle vs théorique (Énergie)**")
                 
-        # Préparation des données : grouper par heure (sur 24h)
-        df_energy = df_data.copy()
-        df_energy["heure"] = df_energy["datetime"].dt.strftime("%H")
-        df_energy_grouped = df_energy.groupby("heure")[["energie_solaire", "energie_solaire_theorique"]].sum().reset_index()
-
-        # Création du graphique
-        fig1 = go.Figure()
-
-        # Barres : énergie solaire réelle
-        fig1.add_trace(go.Bar(
-            x=df_energy_grouped["heure"],
-            y=df_energy_grouped["energie_solaire"],
-            name="E. solaire réelle (kWh)",
-            marker_color="#FFA500",
-            hovertemplate="Heure : %{x}<br>Energie solaire réelle : %{y:.2f} kWh<extra></extra>"
-        ))
+        with etape("figure_energie", lignes=len(heures_periode)):
+            if serie is None:
+                # Période repliée sur les 24 heures de la journée
+                fig1 = figure_energie_solaire(heures_periode)
+            else:
+                fig1 = figure_energie_resolution(serie, resolution)
 
-        # Courbe : énergie solaire théorique
-        fig1.add_trace(go.Scatter(
-            x=df_energy_grouped["heure"],
-            y=df_energy_grouped["energie_solaire_theorique"],
-            name="E. solaire théorique (kWh)",
-            mode="lines+markers",
-            line=dict(color="#EC0E0E", width=3),
-            hovertemplate="Heure : %{x}<br>Energie solaire théorique : %{y:.2f} kWh<extra></extra>"
-        ))
+        st.plotly_chart(fig1, use_container_width=True)
 
-        # Mise en forme
-        fig1.update_layout(
-            xaxis_title="Heure de la journée",
-            yaxis_title="Énergie (kWh)",
-            barmode="group",
-            template="simple_white",
-            
-        )
+        st.write("")
+        st.write("")
 
+        # >>>> Puissance sur la période
+        st.markdown("**🔍 Évolution de la puissance sur la période**")
 
-        st.plotly_chart(fig1, use_container_width=True)
+        # Puissance moyenne et pic par tranche à la résolution choisie ; courbes
+        # sous-échantillonnées (pics conservés) pour rester fluides sur de longues périodes
+        with etape("figure_puissance_periode", lignes=len(df_data)):
+            if serie is None:
+                fig_periode = figure_puissance_periode(df_data)
+            else:
+                fig_periode = figure_puissance_resolution(serie, resolution)
+        st.plotly_chart(fig_periode, use_container_width=True)
 
         st.write("")
         st.write("")
@@ -674,65 +566,49 @@ elif onglet == "📊 Analyse & Visualisation":
 
         
         # Filtrage des jours disponibles dans la période sélectionnée
-        jours_disponibles = df_data["datetime"].dt.date.unique()
+        jours_disponibles = jours_periode.index.date
 
         # Selection pour choisir un jour
         jour_choisi = st.selectbox("📆 Choisir un jour", options=jours_disponibles)
 
         # Filtrage des données du jour choisi
-        df_jour = df_data[df_data["datetime"].dt.date == jour_choisi].copy()
-
-        # Extraction de l'heure exacte pour affichage précis
-        
-        df_jour["heure"] = df_jour["datetime"].dt.strftime("%H:%M")
-        
-
-        # Création du graphique
-        fig2 = go.Figure()
-
-        fig2.add_trace(go.Scatter(
-            x=df_jour["heure"],
-            y=df_jour["puissance_grid"],
-            mode="lines",
-            name="Grid",
-            line=dict(color="#8B2A03")
-        ))
+        with etape("figure_puissance_jour") as mesure:
+            df_jour = decouper_jour(df, agregats, jour_choisi)
+            fig2 = figure_puissance_jour(df_jour)
+            mesure.lignes = len(df_jour)
 
-        fig2.add_trace(go.Scatter(
-            x=df_jour["heure"],
-            y=df_jour["puissance_ge"],
-            mode="lines",
-            name="GE",
-            line=dict(color="#003366")
-        ))
+        st.plotly_chart(fig2, use_container_width=True)
 
-        fig2.add_trace(go.Scatter(
-            x=df_jour["heure"],
-            y=df_jour["puissance_solaire"],
-            mode="lines",
-            name="Solaire",
-            line=dict(color="#FFA500")
-        ))
 
-        fig2.add_trace(go.Scatter(
-            x=df_jour["heure"],
-            y=df_jour["puissance_conso"],
-            mode="lines",
-            name="Installation globale",
-            line=dict(color="#6B6767", dash="dash")
-        ))
+        st.write("")
+        st.write("")
+        st.write("")
 
-        # Mise en forme
-        fig2.update_layout(
-            xaxis_title="Heure",
-            yaxis_title="Puissance (kW)",
-            template="simple_white",
-          
-        )
+        # 4. Qualité des données
 
+        st.header("🧪 Qualité des données")
 
+        st.write("")
 
-        st.plotly_chart(fig2, use_container_width=True)
+        col1, col2 = st.columns([1, 2])
+        with col1:
+            st.markdown("**🔍 Horodatages**")
+            st.dataframe(qualite.tableau_horodatages(), use_container_width=True)
+        with col2:
+            st.markdown("**🔍 Valeurs numériques**")
+            tableau_valeurs = qualite.tableau_valeurs()
+            if tableau_valeurs.empty:
+                st.success("✅ Aucune valeur invalide, vide, négative ou incohérente sur la période.")
+            else:
+                st.dataframe(tableau_valeurs, use_container_width=True)
+            if qualite.invalides is None:
+                st.caption("Valeurs invalides : non disponibles pour l'historique local.")
+
+            st.markdown("**🔍 Statuts hors vocabulaire**")
+            if qualite.statuts_inconnus.empty:
+                st.success("✅ Tous les statuts font partie du vocabulaire attendu.")
+            else:
+                st.dataframe(qualite.tableau_statuts(), hide_index=True, use_container_width=True)
 
 
         st.write("")
@@ -758,60 +634,138 @@ elif onglet == "📊 Analyse & Visualisation":
         inclure_etat = st.checkbox("**2. État de fonctionnement**", value=True)
         inclure_etat_dominant = st.checkbox("↳ État dominant par source", value=True)
         inclure_etat_repartition = st.checkbox("↳ Répartition de l’état de l'installation globale", value=True)
+        inclure_evenements = st.checkbox("↳ Événements détectés (pannes, écrêtage, sous-régime)", value=True)
 
         inclure_evolution = st.checkbox("**3. Évolution temporelle**", value=True)
         inclure_prod_solaire = st.checkbox("↳ Production solaire réelle vs théorique (Energie)", value=True)
         inclure_prod_source = st.checkbox("↳ Production quotidienne par source (Puissance)", value=True)
 
-        # Bouton de génération
-        if st.button("Générer le rapport"):
+        inclure_qualite = st.checkbox("**4. Qualité des données**", value=True)
 
-            # === Paramètres à récupérer dynamiquement ===
-            site = st.session_state.site_name  # à adapter selon ton app
-            date_debut = date_debut.strftime("%Y-%m-%d")
-            date_fin = date_fin.strftime("%Y-%m-%d")
-            date_jour= jour_choisi.strftime("%Y-%m-%d")
-
-            img_prod_path = sauvegarder_fig_plotly(fig, "repartition_production.png")
-            img_etat_path = sauvegarder_fig_plotly(fig_etat, "repartition_etat.png")
-            img_ev1_path = sauvegarder_fig_plotly(fig1, "prod_reelle_vs_theorique.png")
-            img_ev2_path = sauvegarder_fig_plotly(fig2, "prod_quotidienne_sources.png")
-
-
-            # === Appel de la fonction de génération ===
-            rapport_path = generer_rapport_word (
-            site=st.session_state.site_name,
-            date_debut=date_debut,
-            date_fin=date_fin,
-            date_jour=jour_choisi,
-            df_production=tableau1,
-            img_production=img_prod_path,
-            df_etat=df_etat_dominant,
-            img_etat=img_etat_path,
-            img1_evolution=img_ev1_path,
-            img2_evolution=img_ev2_path,
-            inclure_prod=inclure_prod,
-            inclure_etat=inclure_etat,
-            inclure_evolution=inclure_evolution,
-            inclure_synthese_prod=inclure_synthese_prod,
-            inclure_repartition_prod=inclure_repartition_prod,
-            inclure_etat_dominant=inclure_etat_dominant,
-            inclure_prod_solaire=inclure_prod_solaire,
-            inclure_prod_source=inclure_prod_source,
-            logo_path="logo_NEA.png"
+        # Bouton de génération : le rapport est construit en arrière-plan, la page reste utilisable
+        if st.button("Générer le rapport"):
+            from site_analyzer.batch import rapport_periode
+
+            sections = dict(
+                inclure_prod=inclure_prod,
+                inclure_etat=inclure_etat,
+                inclure_evolution=inclure_evolution,
+                inclure_synthese_prod=inclure_synthese_prod,
+                inclure_repartition_prod=inclure_repartition_prod,
+                inclure_etat_dominant=inclure_etat_dominant,
+                inclure_etat_repartition=inclure_etat_repartition,
+                inclure_evenements=inclure_evenements,
+                inclure_prod_solaire=inclure_prod_solaire,
+                inclure_prod_source=inclure_prod_source,
+                inclure_qualite=inclure_qualite,
             )
-            with open(rapport_path, "rb") as f:
-                st.download_button("📥 Télécharger le rapport", f, file_name=f"rapport_analyse_{date_debut}_{date_fin}.docx")
+            # Même source, même période, même jour, mêmes sections et même mode diagnostic (mesures
+            # mémoire) : même tâche, pas de double génération (pour l'historique, la version change
+            # à chaque enregistrement de nouvelles données)
+            if source == "Fichier importé":
+                donnees = st.session_state.cle_donnees
+            else:
+                donnees = f"historique:{site}:{version_historique(site)}"
+            cle = cle_tache(donnees=donnees, site=site, date_debut=date_debut, date_fin=date_fin,
+                            jour=jour_choisi, memoire=diagnostic, **sections)
+            file_rapports().soumettre(
+                cle, rapport_periode, df, agregats, site, date_debut, date_fin, jour=jour_choisi,
+                description=f"{site} {date_debut:%Y-%m-%d} → {date_fin:%Y-%m-%d}", memoire=diagnostic, **sections
+            )
+            st.session_state.tache_rapport = (cle, f"rapport_analyse_{date_debut:%Y-%m-%d}_{date_fin:%Y-%m-%d}.docx")
+
+        if st.session_state.tache_rapport is not None:
+            afficher_rapport(*st.session_state.tache_rapport, mesures)
 
-            
-            # Nettoyage des fichiers images générés
-            #for img_path in [img_prod_path, img_etat_path, img_ev1_path, img_ev2_path]:
-                #if os.path.exists(img_path):
-                   # os.remove(img_path)
+        afficher_mesures(mesures)
 
 
 
 
+# Onglet 4
+elif onglet == "🏭 Flotte de sites":
+    import plotly.graph_objects as go
+
+    from site_analyzer.chargement import FormatFichierError
+    from site_analyzer.flotte import (
+        LIBELLES_FLOTTE, charger_flotte, classement_flotte, nom_site, synthese_flotte
+    )
+
+    st.title("🏭 Flotte de sites")
+
+    # 1. Upload des fichiers (un fichier par site, le nom du fichier donnant le nom du site)
+    fichiers = st.file_uploader(
+        "📄 Importer les fichiers de données des sites (CSV ou Excel)",
+        type=["csv", "xlsx"], accept_multiple_files=True
+    )
+
+    if st.button("Charger la flotte"):
+        if not fichiers:
+            st.error("❌ Aucun fichier n’a été importé.")
+        else:
+            try:
+                cles = charger_flotte({nom_site(f.name): f.getvalue() for f in fichiers})
+                st.session_state.cles_flotte = tuple(sorted(cles.items()))
+                st.success(f"✅ {len(cles)} sites chargés avec succès.")
+            except FormatFichierError as e:
+                st.error(f"❌ {e}")
+            except Exception as e:
+                st.error(f"❌ Erreur lors de la lecture des fichiers : {e}")
+
+    flotte = None
+    if st.session_state.cles_flotte:
+        try:
+            flotte = donnees_flotte(st.session_state.cles_flotte)
+        except FileNotFoundError as e:
+            st.session_state.cles_flotte = None
+            st.error(f"❌ {e}")
+
+    if flotte is not None:
+        st.write("")
+        st.write("**📅 Sélection de la période de comparaison**")
+
+        horodatages = flotte.index.get_level_values("datetime")
+        min_date = horodatages.min().date()
+        max_date = horodatages.max().date()
+
+        col1, col2 = st.columns(2)
+        with col1:
+            date_debut = st.date_input("**Date de début**", min_value=min_date, max_value=max_date, value=min_date)
+        with col2:
+            date_fin = st.date_input("**Date de fin**", min_value=min_date, max_value=max_date, value=max_date)
+
+        if date_fin < date_debut:
+            st.error("❌ La date de fin doit être supérieure ou égale à la date de début.")
+            st.stop()
+
+        # KPIs de tous les sites en un seul passage groupé
+        kpis = synthese_flotte(flotte, date_debut, date_fin)
+
+        criteres = {
+            "Pertes solaires (kWh)": "pertes_solaire",
+            "Pertes solaires (%)": "pertes_solaire_pct",
+            "Part panne nea (%)": "part_panne_nea_pct",
+        }
+        critere = st.radio("**Classement selon**", list(criteres), horizontal=True)
+
+        classement = classement_flotte(kpis, criteres[critere])
+
+        st.markdown("**🔍 Classement des sites**")
+        st.dataframe(
+            classement[list(LIBELLES_FLOTTE)].rename(columns=LIBELLES_FLOTTE).round(2),
+            use_container_width=True
+        )
+
+        top = classement.head(20)
+        fig_flotte = go.Figure(go.Bar(
+            x=top.index.astype(str),
+            y=top[criteres[critere]],
+            marker_color="#FFA500" if criteres[critere].startswith("pertes") else "#D62728",
+        ))
+        fig_flotte.update_layout(xaxis_title="Site", yaxis_title=critere, template="simple_white")
+        st.plotly_chart(fig_flotte, use_container_width=True)
+
+
 # Codé par Amboara RASOLOFOARIMANANA
 
 
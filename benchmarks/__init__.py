@@ -0,0 +1 @@
+"""Mesures de performance de Site Analyzer (scripts exécutables via ``python -m``)."""
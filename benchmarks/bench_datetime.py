@@ -0,0 +1,55 @@
+"""Microbenchmark de la fusion date + heure.
+
+Compare l'ancienne construction (concaténation des deux colonnes texte puis
+``pd.to_datetime``) à ``construire_datetime`` sur le fichier de test fourni.
+
+Utilisation (depuis la racine du projet) :
+
+    python -m benchmarks.bench_datetime [--repetitions 4] [--essais 5]
+"""
+
+import argparse
+import os
+import timeit
+
+import pandas as pd
+
+from site_analyzer.chargement import COLONNES, construire_datetime, lire_fichier
+
+
+FICHIER_TEST = os.path.join(os.path.dirname(__file__), "..", "data", "Fichier d'entrée test.xlsx")
+
+
+def methode_concatenation(df):
+    return pd.to_datetime(df['date'] + ' ' + df['heure'], format='%Y-%m-%d %H:%M:%S')
+
+
+def methode_directe(df):
+    return construire_datetime(df['date'], df['heure'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repetitions", type=int, default=1,
+                        help="nombre de copies du fichier de test concaténées (1 ≈ 3 mois)")
+    parser.add_argument("--essais", type=int, default=5, help="nombre de mesures par méthode")
+    args = parser.parse_args()
+
+    with open(FICHIER_TEST, "rb") as f:
+        df = lire_fichier(f.read())
+    df.columns = COLONNES
+    df = pd.concat([df[['date', 'heure']]] * args.repetitions, ignore_index=True)
+
+    attendu = methode_concatenation(df)
+    obtenu = methode_directe(df)
+    assert (attendu.to_numpy() == obtenu.to_numpy()).all(), "résultats différents"
+
+    print(f"{len(df)} lignes, meilleur temps sur {args.essais} essais")
+    for nom, methode in [("concaténation + to_datetime", methode_concatenation),
+                         ("construire_datetime", methode_directe)]:
+        temps = min(timeit.repeat(lambda: methode(df), number=1, repeat=args.essais))
+        print(f"  {nom:<30} {temps * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
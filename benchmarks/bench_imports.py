@@ -0,0 +1,83 @@
+"""Budget de temps d'import au démarrage de l'application (onglet « Indications »).
+
+Exécute app.py en mode nu (sans serveur Streamlit : l'onglet par défaut,
+Indications, est affiché) sous ``python -X importtime`` et additionne le
+temps d'import cumulé des modules de premier niveau. Échoue si le budget
+est dépassé ou si une dépendance réservée aux autres onglets ou au rapport
+(plotly, python-docx, kaleido...) est chargée.
+
+Utilisation (depuis la racine du projet) :
+
+    python -m benchmarks.bench_imports [--budget-ms 1000] [--repetitions 3] [--detail 10]
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+
+APP = os.path.join(os.path.dirname(__file__), "..", "app.py")
+
+BUDGET_MS = 1000
+
+# Modules qui ne doivent pas être importés pour afficher l'onglet Indications
+MODULES_DIFFERES = [
+    "docx", "plotly", "kaleido", "matplotlib", "altair", "altair_saver", "vl_convert", "reportlab",
+    "pyarrow.dataset", "openpyxl",
+]
+
+LIGNE_IMPORTTIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def temps_imports(app=APP):
+    """Temps d'import cumulé (µs) de chaque module de premier niveau, avec les modules qu'il a chargés."""
+    sortie = subprocess.run(
+        [sys.executable, "-X", "importtime", app], capture_output=True, text=True,
+        cwd=os.path.dirname(os.path.abspath(app))
+    ).stderr
+
+    # Sortie en ordre postfixe : les sous-modules précèdent le module qui les importe
+    premier_niveau, en_attente = {}, []
+    for ligne in sortie.splitlines():
+        correspondance = LIGNE_IMPORTTIME.match(ligne)
+        if correspondance:
+            _, cumule, retrait, module = correspondance.groups()
+            en_attente.append(module)
+            # Un seul espace de retrait : import direct par le script (et non par un autre module)
+            if len(retrait) == 1:
+                premier_niveau[module] = (int(cumule), en_attente)
+                en_attente = []
+    return premier_niveau
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS)
+    parser.add_argument("--repetitions", type=int, default=3,
+                        help="meilleure des exécutions (la première compile aussi les .pyc)")
+    parser.add_argument("--detail", type=int, default=10, help="nombre de modules les plus lents affichés")
+    args = parser.parse_args()
+
+    mesures = [temps_imports() for _ in range(args.repetitions)]
+    premier_niveau = min(mesures, key=lambda mesure: sum(cumule for cumule, _ in mesure.values()))
+    total_ms = sum(cumule for cumule, _ in premier_niveau.values()) / 1000
+
+    for module, (cumule, _) in sorted(premier_niveau.items(), key=lambda item: -item[1][0])[:args.detail]:
+        print(f"{cumule / 1000:9.1f} ms  {module}")
+    print(f"{total_ms:9.1f} ms  total (budget : {args.budget_ms:.0f} ms)")
+
+    # Les imports internes de Streamlit (qui charge lui-même plotly, par exemple) ne sont pas de notre ressort
+    differes = sorted({
+        interdit for racine, (_, modules) in premier_niveau.items() if racine.split(".")[0] != "streamlit"
+        for m in modules for interdit in MODULES_DIFFERES if m == interdit or m.startswith(f"{interdit}.")
+    })
+    if differes:
+        print(f"Modules importés au démarrage alors qu'ils devraient être différés : {', '.join(differes)}")
+    if differes or total_ms > args.budget_ms:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Empreinte mémoire du DataFrame d'analyse, avant / après le plan de types compact.
+
+"Avant" reproduit l'ancien nettoyage : mesures en float64, statuts et colonnes
+date / heure en objets Python, colonne datetime en plus. "Après" est le
+résultat de ``nettoyer_donnees`` (float32, Categorical, index datetime).
+
+Utilisation (depuis la racine du projet) :
+
+    python -m benchmarks.bench_memoire [--repetitions 4]
+"""
+
+import argparse
+import os
+
+import pandas as pd
+
+from site_analyzer.chargement import (
+    COLONNES, COLS_NUMERIQUES, COLS_STATUT, clean_statut, construire_datetime,
+    lire_fichier, nettoyer_donnees, octets_par_ligne
+)
+
+
+FICHIER_TEST = os.path.join(os.path.dirname(__file__), "..", "data", "Fichier d'entrée test.xlsx")
+
+
+def ancien_nettoyage(df):
+    df = df.set_axis(COLONNES, axis=1).astype({col: object for col in ['date', 'heure'] + COLS_STATUT})
+    df['datetime'] = construire_datetime(df['date'], df['heure'])
+    for col in COLS_NUMERIQUES:
+        df[col] = pd.to_numeric(df[col], errors='coerce').astype('float64')
+    for col in COLS_STATUT:
+        df[col] = df[col].apply(clean_statut).astype(object)
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repetitions", type=int, default=1,
+                        help="nombre de copies du fichier de test concaténées (1 ≈ 3 mois)")
+    args = parser.parse_args()
+
+    with open(FICHIER_TEST, "rb") as f:
+        brut = lire_fichier(f.read())
+    brut = pd.concat([brut] * args.repetitions, ignore_index=True)
+
+    avant = octets_par_ligne(ancien_nettoyage(brut))
+    apres = octets_par_ligne(nettoyer_donnees(brut))
+
+    print(f"{len(brut)} lignes")
+    print(f"  avant : {avant:8.1f} octets/ligne  ({avant * len(brut) / 1024 ** 2:7.2f} Mo)")
+    print(f"  après : {apres:8.1f} octets/ligne  ({apres * len(brut) / 1024 ** 2:7.2f} Mo)")
+    print(f"  gain  : x{avant / apres:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Benchmark de l'écriture d'un DataFrame en tableau Word.
+
+Compare l'ancien ``add_table_from_df`` (iterrows + add_row + mise en forme de
+chaque run) à ``ajouter_tableau`` (XML des lignes généré en bloc, style
+partagé) pour des tableaux de taille croissante.
+
+Utilisation (depuis la racine du projet) :
+
+    python -m benchmarks.bench_tableau_word [--lignes 100 500 1000 2000]
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from docx import Document
+from docx.enum.table import WD_TABLE_ALIGNMENT
+from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+from docx.oxml.ns import qn
+from docx.shared import Inches, Pt
+
+from site_analyzer.rapport import ajouter_tableau
+
+
+def ancien_add_table_from_df(doc, df, afficher_index=True):
+    # Version d'origine (generer_rapport_word), conservée pour comparaison
+    df = df.copy()
+    if afficher_index:
+        if df.index.name is None:
+            df.index.name = ""
+        df_reset = df.reset_index()
+    else:
+        df_reset = df
+
+    table = doc.add_table(rows=1, cols=len(df_reset.columns))
+    table.style = 'Table Grid'
+    table.alignment = WD_TABLE_ALIGNMENT.CENTER
+    table.autofit = True
+
+    for row in table.rows:
+        for cell in row.cells:
+            cell.width = Inches(1.75)
+
+    hdr_cells = table.rows[0].cells
+    for i, col in enumerate(df_reset.columns):
+        paragraph = hdr_cells[i].paragraphs[0]
+        paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+        paragraph.style = doc.styles['Normal']
+        run = paragraph.add_run(str(col))
+        run.font.name = 'Calibri'
+        run._element.rPr.rFonts.set(qn('w:eastAsia'), 'Calibri')
+        run.font.size = Pt(10)
+
+    for _, row in df_reset.iterrows():
+        row_cells = table.add_row().cells
+        for i, item in enumerate(row):
+            paragraph = row_cells[i].paragraphs[0]
+            paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+            paragraph.style = doc.styles['Normal']
+            run = paragraph.add_run(str(item) if pd.notna(item) else "—")
+            run.font.name = 'Calibri'
+            run._element.rPr.rFonts.set(qn('w:eastAsia'), 'Calibri')
+            run.font.size = Pt(10)
+
+
+def tableau_test(n):
+    rng = np.random.default_rng(0)
+    index = pd.date_range("2024-01-01", periods=n, freq="D").strftime("%Y-%m-%d")
+    return pd.DataFrame(
+        rng.uniform(0, 1000, size=(n, 4)).round(2),
+        columns=["Grid", "GE", "Solaire", "Installation globale"],
+        index=pd.Index(index, name="Jour")
+    )
+
+
+def mesurer(fonction, df):
+    doc = Document()
+    debut = time.perf_counter()
+    fonction(doc, df)
+    return time.perf_counter() - debut
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lignes", type=int, nargs="+", default=[100, 500, 1000, 2000])
+    args = parser.parse_args()
+
+    print(f"{'lignes':>7} {'ancien (s)':>11} {'µs/ligne':>9} {'nouveau (s)':>12} {'µs/ligne':>9}")
+    for n in args.lignes:
+        df = tableau_test(n)
+        ancien = mesurer(ancien_add_table_from_df, df)
+        nouveau = mesurer(ajouter_tableau, df)
+        print(f"{n:>7} {ancien:>11.3f} {ancien / n * 1e6:>9.0f} {nouveau:>12.3f} {nouveau / n * 1e6:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
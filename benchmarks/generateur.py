@@ -0,0 +1,145 @@
+"""Génère des fichiers de site synthétiques au format d'import (15 colonnes, pas de 10 minutes).
+
+Profil solaire journalier avec saisons et nébulosité, coupures réseau prises
+en relais par le groupe électrogène, statuts dans le vocabulaire des fichiers
+réels (casse et accents compris). Le résultat ne dépend que de la graine.
+
+Utilisation (depuis la racine du projet) :
+
+    python -m benchmarks.generateur [--jours 1 30 365 3650] [--format csv xlsx] [--sortie benchmarks/donnees]
+"""
+
+import argparse
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+
+# En-têtes des fichiers réels (seul l'ordre des colonnes compte à l'import)
+ENTETES = [
+    "DateJour", "Heure",
+    "Grid Puissance (Kw)", "GE Puissance (kW)", "Solaire Puissance (kW)", "Consommation Site Puissance kW",
+    "Egrid", "Ege", "Esolaire", "ESOLtheorique", "LOAD",
+    "STATUT GRID", "STATUT GE", "STATUT SOLAIRE", "Statut Installation"
+]
+
+PAS_MINUTES = 10
+POINTS_PAR_JOUR = 24 * 60 // PAS_MINUTES
+
+PUISSANCE_CRETE_SOLAIRE = 250.0   # kW
+PUISSANCE_MAX_GE = 350.0          # kW
+
+DOSSIER_DONNEES = os.path.join(os.path.dirname(__file__), "donnees")
+
+
+def _alternances(rng, n, duree_marche, duree_coupure):
+    # Succession de périodes de marche / coupure de durées géométriques (en pas de temps)
+    etats, total, marche = [], 0, True
+    while total < n:
+        duree = rng.geometric(1 / (duree_marche if marche else duree_coupure))
+        etats.append(np.full(duree, marche))
+        total += duree
+        marche = not marche
+    return np.concatenate(etats)[:n]
+
+
+def generer_site(jours, debut="2024-01-01", graine=0):
+    """DataFrame brut (colonnes du fichier d'import) couvrant ``jours`` jours."""
+    rng = np.random.default_rng(graine)
+    n = jours * POINTS_PAR_JOUR
+    horodatage = pd.date_range(debut, periods=n, freq=f"{PAS_MINUTES}min")
+    heure = (horodatage.hour + horodatage.minute / 60).to_numpy()
+    jour_annee = horodatage.dayofyear.to_numpy()
+
+    # Solaire : cloche entre 6 h et 18 h, modulée par la saison et la nébulosité du jour
+    cloche = np.clip(np.sin(np.pi * (heure - 6) / 12), 0, None)
+    saison = 1 + 0.15 * np.cos(2 * np.pi * (jour_annee - 172) / 365)
+    nebulosite = np.repeat(rng.uniform(0.5, 1.0, jours), POINTS_PAR_JOUR)
+    theorique = PUISSANCE_CRETE_SOLAIRE * cloche * saison * nebulosite
+    rendement = np.repeat(rng.uniform(0.1, 1.0, jours), POINTS_PAR_JOUR)
+    solaire = theorique * rendement * rng.uniform(0.9, 1.0, n)
+
+    # Consommation : talon + activité de journée + bruit
+    conso = 120 + 80 * np.clip(np.sin(np.pi * (heure - 7) / 13), 0, None) + rng.normal(0, 15, n)
+    conso = np.maximum(conso, 20)
+
+    # Réseau avec coupures ; le GE prend le relais (plafonné) pendant les coupures
+    reseau = _alternances(rng, n, duree_marche=200, duree_coupure=15)
+    appoint = np.maximum(conso - solaire, 0)
+    grid = np.where(reseau, appoint, 0.0)
+    ge = np.where(reseau, 0.0, np.minimum(appoint, PUISSANCE_MAX_GE))
+    conso = grid + ge + solaire
+
+    # Statuts
+    ratio = np.divide(solaire, theorique, out=np.zeros(n), where=theorique > 1)
+    statut_solaire = np.select(
+        [ratio > 0.8, ratio > 0.6, ratio > 0.4], ["Excellent", "Tolérable", "Mauvaise"], "Critique"
+    )
+    statut_ge = np.select([reseau, ge < 0.6 * PUISSANCE_MAX_GE], ["eteint", "sous régime"], "normal")
+    statut_installation = np.select(
+        [rendement < 0.4, rendement < 0.8], ["Panne NEA", "ecretage client"], "RAS"
+    ).astype(object)
+    statut_installation[rng.random(n) < 0.02] = None
+
+    energie = PAS_MINUTES / 60
+    df = pd.DataFrame({
+        "DateJour": horodatage.strftime("%Y-%m-%d"),
+        "Heure": horodatage.strftime("%H:%M:%S"),
+        "Grid Puissance (Kw)": grid,
+        "GE Puissance (kW)": ge,
+        "Solaire Puissance (kW)": solaire,
+        "Consommation Site Puissance kW": conso,
+        "Egrid": grid * energie,
+        "Ege": ge * energie,
+        "Esolaire": solaire * energie,
+        "ESOLtheorique": theorique * energie,
+        "LOAD": conso * energie,
+        "STATUT GRID": np.where(reseau, "on", "off"),
+        "STATUT GE": statut_ge,
+        "STATUT SOLAIRE": statut_solaire,
+        "Statut Installation": statut_installation,
+    })
+    return df[ENTETES]
+
+
+def en_octets(df, format_fichier):
+    """Contenu du fichier tel qu'importé dans l'application (``csv`` ou ``xlsx``)."""
+    tampon = io.BytesIO()
+    if format_fichier == "csv":
+        df.to_csv(tampon, index=False)
+    else:
+        df.to_excel(tampon, index=False)
+    return tampon.getvalue()
+
+
+def fichier_site(jours, format_fichier, dossier=None, graine=0):
+    """Chemin d'un fichier synthétique, généré s'il n'existe pas encore."""
+    dossier = dossier or DOSSIER_DONNEES
+    chemin = os.path.join(dossier, f"site_{jours}j_{graine}.{format_fichier}")
+    if not os.path.exists(chemin):
+        os.makedirs(dossier, exist_ok=True)
+        contenu = en_octets(generer_site(jours, graine=graine), format_fichier)
+        with open(f"{chemin}.tmp", "wb") as f:
+            f.write(contenu)
+        os.replace(f"{chemin}.tmp", chemin)
+    return chemin
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jours", type=int, nargs="+", default=[1, 30, 365, 3650])
+    parser.add_argument("--format", nargs="+", choices=["csv", "xlsx"], default=["csv", "xlsx"])
+    parser.add_argument("--sortie", default=DOSSIER_DONNEES)
+    parser.add_argument("--graine", type=int, default=0)
+    args = parser.parse_args()
+
+    for jours in args.jours:
+        for format_fichier in args.format:
+            chemin = fichier_site(jours, format_fichier, args.sortie, args.graine)
+            print(f"{jours:>5} jours  {format_fichier:<4}  {os.path.getsize(chemin) / 1024 ** 2:8.1f} Mo  {chemin}")
+
+
+if __name__ == "__main__":
+    main()
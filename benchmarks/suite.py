@@ -0,0 +1,212 @@
+"""Suite de benchmarks du pipeline complet sur des sites synthétiques de 1 jour à 10 ans.
+
+Étapes mesurées pour chaque taille et chaque format : lecture du fichier,
+nettoyage, filtrage d'une période, agrégats, KPIs, événements, qualité, séries aux
+différentes résolutions, construction des figures, export PNG et génération
+du rapport Word. Les résultats sont enregistrés en JSON (un fichier par commit)
+et peuvent être comparés à un résultat de référence pour repérer les régressions.
+
+Utilisation (depuis la racine du projet) :
+
+    python -m benchmarks.suite [--jours 1 30 365 3650] [--format csv xlsx] [--repetitions 3]
+                               [--memoire] [--comparer benchmarks/resultats/<fichier>.json]
+                               [--resultats <dossier>]
+"""
+
+import argparse
+import datetime as dt
+import json
+import os
+import platform
+import subprocess
+import sys
+
+import pandas as pd
+
+from benchmarks.generateur import fichier_site
+from site_analyzer.agregation import (
+    calculer_synthese, construire_agregats, decouper_jour, decouper_periode, selection_heures,
+    selection_jours
+)
+from site_analyzer.chargement import lire_fichier, nettoyer_donnees
+from site_analyzer.evenements import detecter_evenements
+from site_analyzer.figures import (
+    exporter_figures, figure_energie_solaire, figure_puissance_jour, figure_puissance_periode,
+    figure_repartition_etat, figure_repartition_production, vider_cache_png
+)
+from site_analyzer.profilage import mesurer
+from site_analyzer.qualite import controler_qualite
+from site_analyzer.rapport import LOGO_NEA, generer_rapport_word
+from site_analyzer.resolutions import RESOLUTIONS, reechantillonner
+from site_analyzer.statuts import matrice_depuis_agregats, tableau_etat_dominant
+
+
+DOSSIER_RESULTATS = os.path.join(os.path.dirname(__file__), "resultats")
+
+# Ralentissement (rapport des durées) au-delà duquel une étape est signalée ;
+# les étapes trop courtes pour être mesurées de façon stable sont ignorées
+SEUIL_REGRESSION = 1.25
+DUREE_MIN_S = 0.005
+
+
+def commit_courant():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(__file__)
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "inconnu"
+
+
+def executer_pipeline(file_bytes, mesures, memoire=False):
+    # Même enchaînement que l'onglet d'analyse suivi de la génération du rapport
+    etape = lambda nom, lignes=None: mesurer(nom, lignes=lignes, mesures=mesures, memoire=memoire)
+
+    with etape("lecture_fichier") as mesure:
+        brut = lire_fichier(file_bytes)
+        mesure.lignes = len(brut)
+    with etape("nettoyage", lignes=len(brut)):
+        df = nettoyer_donnees(brut)
+
+    # Période d'analyse : le dernier mois (au plus) du fichier
+    date_fin = df.index.max().date()
+    date_debut = max(df.index.min().date(), date_fin - dt.timedelta(days=30))
+    with etape("filtre_periode") as mesure:
+        df_data = decouper_periode(df, date_debut, date_fin)
+        mesure.lignes = len(df_data)
+
+    with etape("agregats", lignes=len(df)):
+        agregats = construire_agregats(df)
+    with etape("kpi") as mesure:
+        jours_periode = selection_jours(agregats.jours, date_debut, date_fin)
+        synthese = calculer_synthese(jours_periode, agregats.pas_minutes)
+        synthese.tableau()
+        matrice_statuts = matrice_depuis_agregats(selection_jours(agregats.statuts_jours, date_debut, date_fin))
+        df_etat = tableau_etat_dominant(matrice_statuts)
+        mesure.lignes = len(jours_periode)
+    with etape("evenements", lignes=len(df_data)):
+        evenements = detecter_evenements(df_data, agregats.pas_minutes)
+    with etape("qualite", lignes=len(df_data)):
+        qualite = controler_qualite(df_data, agregats.pas_minutes, date_debut, date_fin + dt.timedelta(days=1))
+    with etape("resolutions", lignes=len(df)):
+        # Toutes les résolutions sur l'ensemble du fichier (sélecteur de l'onglet d'analyse)
+        for resolution in RESOLUTIONS:
+            reechantillonner(df, resolution)
+
+    with etape("figures", lignes=len(df_data)):
+        figures = {
+            "production": figure_repartition_production(synthese),
+            "etat": figure_repartition_etat(matrice_statuts["Installation globale"]),
+            "evolution_energie": figure_energie_solaire(selection_heures(agregats.heures, date_debut, date_fin)),
+            "evolution_puissance": figure_puissance_jour(decouper_jour(df, agregats, date_debut)),
+        }
+        figure_puissance_periode(df_data)
+
+    vider_cache_png()
+    with etape("export_png", lignes=len(figures)) as mesure:
+        images = exporter_figures(figures)
+    if None in images.values():
+        # Rendu kaleido indisponible (navigateur absent) : étape non mesurée,
+        # le logo sert d'image pour mesurer tout de même l'insertion dans le rapport
+        mesure.duree_s = None
+        with open(LOGO_NEA, "rb") as f:
+            images = dict.fromkeys(images, f.read())
+
+    with etape("rapport_word"):
+        generer_rapport_word(
+            site="Benchmark",
+            date_debut=date_debut.strftime("%Y-%m-%d"),
+            date_fin=date_fin.strftime("%Y-%m-%d"),
+            date_jour=date_debut,
+            synthese_production=synthese,
+            img_production=images["production"],
+            df_etat=df_etat,
+            img_etat=images["etat"],
+            img1_evolution=images["evolution_energie"],
+            img2_evolution=images["evolution_puissance"],
+            evenements=evenements,
+            qualite=qualite,
+            logo_path=LOGO_NEA,
+        )
+
+
+def mesurer_taille(jours, format_fichier, repetitions, memoire=False):
+    """Meilleure durée de chaque étape sur ``repetitions`` exécutions."""
+    with open(fichier_site(jours, format_fichier), "rb") as f:
+        file_bytes = f.read()
+
+    lignes = []
+    for _ in range(repetitions):
+        mesures = []
+        executer_pipeline(file_bytes, mesures, memoire)
+        lignes += [{"jours": jours, "format": format_fichier, **vars(m)} for m in mesures]
+
+    resultat = (pd.DataFrame(lignes)
+                .groupby(["jours", "format", "etape"], sort=False)
+                .agg(duree_s=("duree_s", "min"), lignes=("lignes", "max"), memoire_pic_mo=("memoire_pic_mo", "max"))
+                .reset_index())
+    return resultat.astype({"lignes": "Int64"})
+
+
+def enregistrer(resultats, dossier=None):
+    dossier = dossier or DOSSIER_RESULTATS
+    os.makedirs(dossier, exist_ok=True)
+    commit = commit_courant()
+    contenu = {
+        "commit": commit,
+        "date": dt.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "machine": platform.node(),
+        "resultats": json.loads(resultats.to_json(orient="records")),
+    }
+    chemin = os.path.join(dossier, f"{dt.date.today():%Y%m%d}_{commit}.json")
+    with open(chemin, "w", encoding="utf-8") as f:
+        json.dump(contenu, f, indent=1)
+    return chemin
+
+
+def comparer(resultats, chemin_reference, seuil=SEUIL_REGRESSION):
+    """Rapport des durées par rapport à la référence ; renvoie les étapes en régression."""
+    with open(chemin_reference, encoding="utf-8") as f:
+        reference = pd.DataFrame(json.load(f)["resultats"])
+
+    cles = ["jours", "format", "etape"]
+    comparaison = resultats.merge(reference[cles + ["duree_s"]], on=cles, suffixes=("", "_reference"))
+    comparaison = comparaison[cles + ["duree_s_reference", "duree_s"]]
+    comparaison["rapport"] = comparaison["duree_s"] / comparaison["duree_s_reference"]
+    regressions = (comparaison["rapport"] > seuil) & (comparaison["duree_s_reference"] >= DUREE_MIN_S)
+    return comparaison, comparaison[regressions]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jours", type=int, nargs="+", default=[1, 30, 365, 3650])
+    parser.add_argument("--format", nargs="+", choices=["csv", "xlsx"], default=["csv", "xlsx"])
+    parser.add_argument("--repetitions", type=int, default=3)
+    parser.add_argument("--memoire", action="store_true", help="mesure aussi le pic mémoire (plus lent)")
+    parser.add_argument("--comparer", metavar="JSON", help="résultat de référence (benchmarks/resultats/)")
+    parser.add_argument("--seuil", type=float, default=SEUIL_REGRESSION)
+    parser.add_argument("--resultats", default=DOSSIER_RESULTATS, help="dossier où enregistrer les résultats")
+    args = parser.parse_args()
+
+    resultats = []
+    for jours in args.jours:
+        for format_fichier in args.format:
+            print(f"{jours} jour(s), {format_fichier}...", flush=True)
+            resultats.append(mesurer_taille(jours, format_fichier, args.repetitions, args.memoire))
+    resultats = pd.concat(resultats, ignore_index=True)
+    print(resultats.to_string(index=False, float_format="{:.4f}".format, na_rep="—"))
+    print(f"\nRésultats enregistrés dans {enregistrer(resultats, args.resultats)}")
+
+    if args.comparer:
+        comparaison, regressions = comparer(resultats, args.comparer, args.seuil)
+        print(comparaison.to_string(index=False, float_format="{:.4f}".format, na_rep="—"))
+        if not regressions.empty:
+            print(f"\n{len(regressions)} étape(s) plus de {args.seuil:.2f}× plus lente(s) que la référence.")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
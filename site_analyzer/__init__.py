@@ -0,0 +1,23 @@
+"""Outils de traitement des données de site utilisés par l'application Site Analyzer."""
+
+from site_analyzer.chargement import (
+    COLONNES,
+    COLS_ENERGIE,
+    COLS_NUMERIQUES,
+    COLS_PUISSANCE,
+    COLS_STATUT,
+    VOCABULAIRES_STATUT,
+    FormatFichierError,
+    clean_statut,
+    construire_datetime,
+    load_and_clean,
+    normaliser_statut,
+    octets_par_ligne,
+)
+from site_analyzer.agregation import (
+    Agregats,
+    SyntheseProduction,
+    calculer_synthese,
+    construire_agregats,
+    pas_echantillonnage,
+)
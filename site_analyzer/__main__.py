@@ -0,0 +1,6 @@
+import sys
+
+from site_analyzer.cli import main
+
+
+sys.exit(main())
@@ -0,0 +1,219 @@
+# Agrégats journaliers et horaires, construits une fois au chargement des données
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from site_analyzer.chargement import COLS_ENERGIE, COLS_PUISSANCE, COLS_STATUT
+
+
+# Sources pour lesquelles on compte les heures de marche (puissance > 0)
+COLS_MARCHE = ['puissance_grid', 'puissance_ge', 'puissance_solaire']
+
+# Libellé affiché -> suffixe des colonnes de la source
+SOURCES = {'Grid': 'grid', 'GE': 'ge', 'Solaire': 'solaire', 'Installation globale': 'conso'}
+
+# Pas d'échantillonnage par défaut (min), si les données ne permettent pas de le déduire
+PAS_DEFAUT_MIN = 10
+
+
+@dataclass
+class Agregats:
+    """Agrégats d'un site par heure et par jour.
+
+    Tables de mesures (index : début de l'heure / du jour) :
+    ``nb_lignes``, ``pic_puissance_*`` (max), ``energie_*`` (somme, float64)
+    et ``nb_marche_*`` (lignes avec puissance > 0).
+    Tables de statuts : nombre de lignes par (colonne de statut, statut).
+    ``positions_jours`` : positions [debut, fin) de chaque jour dans le DataFrame trié.
+    ``pas_minutes`` : pas d'échantillonnage déduit des horodatages.
+    """
+    heures: pd.DataFrame
+    jours: pd.DataFrame
+    statuts_heures: pd.DataFrame
+    statuts_jours: pd.DataFrame
+    positions_jours: pd.DataFrame
+    pas_minutes: float
+
+
+@dataclass
+class SyntheseProduction:
+    """KPIs de production d'une période, par source (clés : libellés de ``SOURCES``)."""
+    pics: dict                 # kW
+    heures_marche: dict        # h, sauf installation globale
+    energies: dict             # kWh
+    energie_solaire_theorique: float
+    pas_minutes: float
+
+    @property
+    def pertes_solaire(self):
+        return self.energie_solaire_theorique - self.energies['Solaire']
+
+    def tableau(self):
+        # Tableau croisé de synthèse (affichage et rapport)
+        colonnes = {}
+        for source in SOURCES:
+            colonnes[source] = [
+                round(self.pics[source], 2),
+                round(self.heures_marche[source], 2) if source in self.heures_marche else None,
+                round(self.energies[source], 2),
+                round(self.energie_solaire_theorique, 2) if source == 'Solaire' else None,
+                round(self.pertes_solaire, 2) if source == 'Solaire' else None,
+            ]
+        return pd.DataFrame(colonnes, index=[
+            "Pic de puissance (kW)",
+            "Heures de marche (h)",
+            "Énergie réelle produite (kWh)",
+            "Énergie théorique produite (kWh)",
+            "Pertes énergétiques (kWh)"
+        ])
+
+
+def _compter_statuts(df, codes, n):
+    # Comptage (tranche, statut) en un seul bincount par colonne, sur les codes catégoriels
+    tables = {}
+    for col in COLS_STATUT:
+        statut = df[col].array
+        k = len(statut.categories)
+        comptes = np.bincount(codes * k + statut.codes, minlength=n * k).reshape(n, k)
+        tables[col] = pd.DataFrame(comptes, columns=list(statut.categories))
+    return pd.concat(tables, axis=1)
+
+
+def pas_echantillonnage(index):
+    """Pas d'échantillonnage (min) : écart médian entre horodatages successifs distincts."""
+    valeurs = index[index.notna()].to_numpy()
+    ecarts = pd.TimedeltaIndex(np.diff(valeurs))
+    ecarts = ecarts[ecarts > pd.Timedelta(0)]
+    if len(ecarts) == 0:
+        return PAS_DEFAUT_MIN
+    return ecarts.median() / pd.Timedelta(minutes=1)
+
+
+def construire_agregats(df):
+    df = df[df.index.notna()]
+
+    # Numéro de l'heure de chaque ligne (index trié : tranches croissantes)
+    codes, debuts = pd.factorize(df.index.floor('h'), sort=True)
+    n = len(debuts)
+
+    heures = pd.concat([
+        pd.Series(np.bincount(codes, minlength=n), name='nb_lignes'),
+        df[COLS_PUISSANCE].groupby(codes).max().add_prefix('pic_'),
+        df[COLS_ENERGIE].astype('float64').groupby(codes).sum(),
+        (df[COLS_MARCHE] > 0).groupby(codes).sum()
+            .rename(columns=lambda col: col.replace('puissance_', 'nb_marche_')),
+    ], axis=1)
+    heures.index = pd.DatetimeIndex(debuts, name='datetime')
+
+    statuts_heures = _compter_statuts(df, codes, n)
+    statuts_heures.index = heures.index
+
+    # Les agrégats journaliers se déduisent des agrégats horaires
+    jour = heures.index.normalize()
+    jours = heures.groupby(jour).agg(_reducteurs(heures)).rename_axis('datetime')
+    statuts_jours = statuts_heures.groupby(jour).sum().rename_axis('datetime')
+
+    return Agregats(heures, jours, statuts_heures, statuts_jours, _positions_jours(jours),
+                    pas_echantillonnage(df.index))
+
+
+def _reducteurs(table):
+    return {col: ('max' if col.startswith('pic_') else 'sum') for col in table.columns}
+
+
+def _positions_jours(jours):
+    # Jours contigus dans le DataFrame trié : les bornes découlent du nombre de lignes par jour
+    fins = jours['nb_lignes'].cumsum()
+    return pd.DataFrame({'debut': fins - jours['nb_lignes'], 'fin': fins})
+
+
+def _fusionner(ancienne, nouvelle, debut, reducteurs=None):
+    # Seules les tranches à partir de `debut` sont recombinées, le reste est repris tel quel
+    stable = ancienne[ancienne.index < debut]
+    a_combiner = pd.concat([ancienne[ancienne.index >= debut], nouvelle])
+    if reducteurs is None:
+        combinee = a_combiner.groupby(level=0).sum()
+    else:
+        combinee = a_combiner.groupby(level=0).agg(reducteurs)
+    return pd.concat([stable, combinee]).rename_axis('datetime')
+
+
+def mettre_a_jour_agregats(agregats, nouvelles_lignes):
+    """Intègre des lignes ajoutées aux agrégats existants, sans repartir des données brutes.
+
+    Seules les heures et jours touchés par les nouvelles lignes sont recalculés.
+    """
+    nouveaux = construire_agregats(nouvelles_lignes)
+    if nouveaux.heures.empty:
+        return agregats
+
+    debut = nouveaux.heures.index[0]
+    heures = _fusionner(agregats.heures, nouveaux.heures, debut, _reducteurs(agregats.heures))
+    jours = _fusionner(agregats.jours, nouveaux.jours, debut.normalize(), _reducteurs(agregats.jours))
+
+    # Statuts inédits dans les nouvelles lignes : colonnes complétées par des zéros
+    statuts_heures = _fusionner(agregats.statuts_heures, nouveaux.statuts_heures, debut)
+    statuts_jours = _fusionner(agregats.statuts_jours, nouveaux.statuts_jours, debut.normalize())
+    statuts_heures = statuts_heures.fillna(0).astype(np.int64)
+    statuts_jours = statuts_jours.fillna(0).astype(np.int64)
+
+    pas_minutes = agregats.pas_minutes if len(agregats.heures) else nouveaux.pas_minutes
+    return Agregats(heures, jours, statuts_heures, statuts_jours, _positions_jours(jours), pas_minutes)
+
+
+def calculer_synthese(table, pas_minutes):
+    """Calcule tous les KPIs de production en un seul passage sur une table d'agrégats.
+
+    ``table`` : sélection de ``Agregats.jours`` ou ``Agregats.heures``.
+    """
+    reducteurs = {}
+    for suffixe in SOURCES.values():
+        reducteurs[f'pic_puissance_{suffixe}'] = 'max'
+        reducteurs[f'energie_{suffixe}'] = 'sum'
+    reducteurs['energie_solaire_theorique'] = 'sum'
+    for col in COLS_MARCHE:
+        reducteurs[col.replace('puissance_', 'nb_marche_')] = 'sum'
+
+    resultat = table.agg(reducteurs).astype('float64')
+
+    return SyntheseProduction(
+        pics={source: resultat[f'pic_puissance_{suffixe}'] for source, suffixe in SOURCES.items()},
+        heures_marche={
+            source: resultat[f'nb_marche_{suffixe}'] * pas_minutes / 60
+            for source, suffixe in SOURCES.items() if f'nb_marche_{suffixe}' in resultat
+        },
+        energies={source: resultat[f'energie_{suffixe}'] for source, suffixe in SOURCES.items()},
+        energie_solaire_theorique=resultat['energie_solaire_theorique'],
+        pas_minutes=pas_minutes,
+    )
+
+
+def decouper_periode(df, date_debut, date_fin):
+    """Lignes de ``df`` entre deux dates incluses (vue, sans copie).
+
+    L'index étant trié, les bornes sont trouvées par recherche dichotomique.
+    """
+    debut = df.index.searchsorted(pd.Timestamp(date_debut), side='left')
+    fin = df.index.searchsorted(pd.Timestamp(date_fin) + pd.Timedelta(days=1), side='left')
+    return df.iloc[debut:fin]
+
+
+def decouper_jour(df, agregats, jour):
+    # Lignes d'un jour via la table des positions (vue, sans copie)
+    jour = pd.Timestamp(jour)
+    if jour not in agregats.positions_jours.index:
+        return df.iloc[0:0]
+    debut, fin = agregats.positions_jours.loc[jour, ['debut', 'fin']]
+    return df.iloc[debut:fin]
+
+
+def selection_jours(table, date_debut, date_fin):
+    # Index trié : découpage par étiquettes (recherche dichotomique, sans parcours complet)
+    return table.loc[pd.Timestamp(date_debut):pd.Timestamp(date_fin)]
+
+
+def selection_heures(table, date_debut, date_fin):
+    fin = pd.Timestamp(date_fin) + pd.Timedelta(days=1) - pd.Timedelta(microseconds=1)
+    return table.loc[pd.Timestamp(date_debut):fin]
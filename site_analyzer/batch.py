@@ -0,0 +1,167 @@
+# Génération de rapports en lot (plusieurs sites, plusieurs périodes), sans interface
+
+import calendar
+import datetime as dt
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from site_analyzer.agregation import (
+    calculer_synthese, construire_agregats, decouper_jour, decouper_periode, selection_heures,
+    selection_jours
+)
+from site_analyzer.cache import charger_avec_cache, lire_cache
+from site_analyzer.chargement import load_and_clean
+from site_analyzer.evenements import detecter_evenements
+from site_analyzer.figures import (
+    exporter_figures, figure_energie_solaire, figure_puissance_jour, figure_repartition_etat,
+    figure_repartition_production
+)
+from site_analyzer.profilage import mesurer
+from site_analyzer.qualite import controler_qualite
+from site_analyzer.rapport import LOGO_NEA, generer_rapport_word
+from site_analyzer.statuts import matrice_depuis_agregats, tableau_etat_dominant
+
+
+EXTENSIONS_DONNEES = ('.csv', '.xlsx', '.xlsm')
+
+# Étapes de construction d'un rapport (suivi de progression)
+ETAPES_RAPPORT = ["Calcul des indicateurs", "Export des figures", "Rédaction du document"]
+
+
+def lire_periode(texte):
+    """Convertit "AAAA-MM" (mois entier) ou "AAAA-MM-JJ:AAAA-MM-JJ" en (date_debut, date_fin)."""
+    texte = texte.strip()
+    if ":" in texte:
+        debut, fin = (dt.date.fromisoformat(partie.strip()) for partie in texte.split(":", 1))
+    else:
+        annee, mois = (int(partie) for partie in texte.split("-"))
+        debut = dt.date(annee, mois, 1)
+        fin = dt.date(annee, mois, calendar.monthrange(annee, mois)[1])
+
+    if fin < debut:
+        raise ValueError(f"Période invalide : {texte} (fin avant début)")
+    return debut, fin
+
+
+def fichiers_sites(dossier):
+    # Un fichier de données par site, le nom du fichier donnant le nom du site
+    return sorted(
+        os.path.join(dossier, nom) for nom in os.listdir(dossier)
+        if nom.lower().endswith(EXTENSIONS_DONNEES) and not nom.startswith("~$")
+    )
+
+
+def rapport_periode(df, agregats, site, date_debut, date_fin, jour=None, progression=None,
+                    figures_manquantes=None, **sections):
+    """Construit le rapport Word (octets) d'un site sur une période, ou None sans données.
+
+    ``jour`` : journée du graphique de puissance (par défaut, le premier jour
+    de la période). ``progression(etape, fraction)`` est appelée au début de
+    chaque étape. ``figures_manquantes`` : liste complétée par le nom des figures
+    dont l'export PNG a échoué. ``sections`` : options ``inclure_*`` de ``generer_rapport_word``.
+    """
+    progression = progression or (lambda etape, fraction: None)
+
+    jours_periode = selection_jours(agregats.jours, date_debut, date_fin)
+    if jours_periode.empty:
+        return None
+
+    progression(ETAPES_RAPPORT[0], 0.0)
+    with mesurer("rapport_indicateurs"):
+        synthese = calculer_synthese(jours_periode, agregats.pas_minutes)
+        matrice_statuts = matrice_depuis_agregats(selection_jours(agregats.statuts_jours, date_debut, date_fin))
+        heures_periode = selection_heures(agregats.heures, date_debut, date_fin)
+        df_periode = decouper_periode(df, date_debut, date_fin)
+        evenements = detecter_evenements(df_periode, agregats.pas_minutes)
+        qualite = controler_qualite(df_periode, agregats.pas_minutes, date_debut,
+                                    date_fin + dt.timedelta(days=1))
+
+        jour = jour or jours_periode.index[0].date()
+        df_jour = decouper_jour(df, agregats, jour)
+
+    progression(ETAPES_RAPPORT[1], 0.2)
+    with mesurer("rapport_figures", lignes=4):
+        images = exporter_figures({
+            "production": figure_repartition_production(synthese),
+            "etat": figure_repartition_etat(matrice_statuts["Installation globale"]),
+            "evolution_energie": figure_energie_solaire(heures_periode),
+            "evolution_puissance": figure_puissance_jour(df_jour),
+        })
+    if figures_manquantes is not None:
+        figures_manquantes += [nom for nom, png in images.items() if png is None]
+
+    progression(ETAPES_RAPPORT[2], 0.8)
+    with mesurer("rapport_word"):
+        return generer_rapport_word(
+            site=site,
+            date_debut=date_debut.strftime("%Y-%m-%d"),
+            date_fin=date_fin.strftime("%Y-%m-%d"),
+            date_jour=jour,
+            synthese_production=synthese,
+            img_production=images["production"],
+            df_etat=tableau_etat_dominant(matrice_statuts),
+            img_etat=images["etat"],
+            img1_evolution=images["evolution_energie"],
+            img2_evolution=images["evolution_puissance"],
+            evenements=evenements,
+            qualite=qualite,
+            logo_path=LOGO_NEA if os.path.exists(LOGO_NEA) else None,
+            **sections
+        )
+
+
+def traiter_site(chemin, periodes, dossier_sortie):
+    """Génère les rapports d'un site pour toutes les périodes (fichier lu une seule fois).
+
+    Renvoie une liste de (période, chemin du rapport ou None, message) ; le message
+    d'un rapport généré signale les figures qui n'ont pas pu être exportées.
+    """
+    site = os.path.splitext(os.path.basename(chemin))[0]
+    with open(chemin, "rb") as f:
+        file_bytes = f.read()
+
+    df = lire_cache(charger_avec_cache(file_bytes))
+    if df is None:
+        df = load_and_clean(file_bytes)
+    agregats = construire_agregats(df)
+
+    resultats = []
+    for date_debut, date_fin in periodes:
+        figures_manquantes = []
+        rapport = rapport_periode(df, agregats, site, date_debut, date_fin, figures_manquantes=figures_manquantes)
+        if rapport is None:
+            resultats.append(((date_debut, date_fin), None, "aucune donnée sur la période"))
+            continue
+
+        chemin_rapport = os.path.join(
+            dossier_sortie, f"rapport_analyse_{site}_{date_debut:%Y-%m-%d}_{date_fin:%Y-%m-%d}.docx"
+        )
+        with open(chemin_rapport, "wb") as f:
+            f.write(rapport)
+        message = "ok"
+        if figures_manquantes:
+            message = f"{len(figures_manquantes)} figure(s) non exportée(s) : {', '.join(figures_manquantes)}"
+        resultats.append(((date_debut, date_fin), chemin_rapport, message))
+    return resultats
+
+
+def generer_lot(dossier, periodes, dossier_sortie, processus=None):
+    """Génère un rapport par (site, période), les sites étant traités en parallèle.
+
+    Renvoie ``{chemin du fichier site: liste de résultats ou exception}`` ; le
+    dossier de sortie n'est créé que s'il y a des fichiers à traiter.
+    """
+    fichiers = fichiers_sites(dossier)
+    if not fichiers:
+        return {}
+    os.makedirs(dossier_sortie, exist_ok=True)
+
+    resultats = {}
+    with ProcessPoolExecutor(max_workers=processus) as pool:
+        taches = {chemin: pool.submit(traiter_site, chemin, periodes, dossier_sortie) for chemin in fichiers}
+        for chemin, tache in taches.items():
+            try:
+                resultats[chemin] = tache.result()
+            except Exception as e:
+                resultats[chemin] = e
+    return resultats
@@ -0,0 +1,105 @@
+# Cache disque des données nettoyées (format Feather / Arrow IPC)
+
+import hashlib
+import os
+import tempfile
+
+import pyarrow.feather as feather
+
+from site_analyzer.chargement import load_and_clean
+
+
+# Version du format des données nettoyées : à incrémenter dès que le
+# nettoyage change, pour ne pas relire d'anciennes entrées incompatibles
+VERSION_CACHE = 4
+
+DOSSIER_CACHE = os.environ.get(
+    "SITE_ANALYZER_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "site_analyzer")
+)
+
+# Taille maximale du cache (Mo) avant éviction des entrées les plus anciennes
+TAILLE_MAX_CACHE_MO = float(os.environ.get("SITE_ANALYZER_CACHE_MAX_MO", 500))
+
+
+def empreinte(file_bytes):
+    return f"{hashlib.sha256(file_bytes).hexdigest()}-v{VERSION_CACHE}"
+
+
+def chemin_cache(cle, dossier=None):
+    return os.path.join(dossier or DOSSIER_CACHE, f"{cle}.feather")
+
+
+def lire_cache(cle, dossier=None):
+    """Relit une entrée du cache (fichier mappé en mémoire), ou None si absente.
+
+    Une colonne par bloc pandas (``split_blocks``) : les mesures et les codes des
+    statuts restent des vues en lecture seule sur le fichier mappé, sans copie.
+    """
+    chemin = chemin_cache(cle, dossier)
+    try:
+        table = feather.read_table(chemin, memory_map=True)
+    except OSError:
+        return None
+
+    # Date d'accès mise à jour pour l'éviction (moins récemment utilisé en premier)
+    os.utime(chemin)
+    return table.to_pandas(split_blocks=True)
+
+
+def ecrire_cache(cle, df, dossier=None):
+    dossier = dossier or DOSSIER_CACHE
+    os.makedirs(dossier, exist_ok=True)
+
+    # Écriture dans un fichier temporaire puis renommage : une lecture
+    # concurrente ne voit jamais une entrée à moitié écrite
+    fd, chemin_tmp = tempfile.mkstemp(dir=dossier, suffix=".tmp")
+    os.close(fd)
+    try:
+        # Non compressé pour permettre la lecture par memory-mapping
+        feather.write_feather(df, chemin_tmp, compression="uncompressed")
+        os.replace(chemin_tmp, chemin_cache(cle, dossier))
+    finally:
+        if os.path.exists(chemin_tmp):
+            os.remove(chemin_tmp)
+
+    evincer(dossier, conserver=cle)
+
+
+def evincer(dossier=None, taille_max_mo=None, conserver=None):
+    """Supprime les entrées les moins récemment utilisées au-delà de la taille maximale.
+
+    L'entrée ``conserver`` (typiquement celle qui vient d'être écrite) n'est jamais supprimée.
+    """
+    dossier = dossier or DOSSIER_CACHE
+    taille_max = (taille_max_mo if taille_max_mo is not None else TAILLE_MAX_CACHE_MO) * 1024 ** 2
+
+    entrees = []
+    for nom in os.listdir(dossier):
+        if nom.endswith(".feather") and nom != f"{conserver}.feather":
+            stat = os.stat(os.path.join(dossier, nom))
+            entrees.append((stat.st_mtime, stat.st_size, nom))
+
+    taille = sum(e[1] for e in entrees)
+    if conserver and os.path.exists(chemin_cache(conserver, dossier)):
+        taille += os.path.getsize(chemin_cache(conserver, dossier))
+    for _, taille_entree, nom in sorted(entrees):
+        if taille <= taille_max:
+            break
+        try:
+            os.remove(os.path.join(dossier, nom))
+        except FileNotFoundError:
+            pass
+        except OSError:
+            # Entrée encore mappée par un DataFrame en cours d'utilisation (Windows) :
+            # elle sera supprimée à une prochaine éviction
+            continue
+        taille -= taille_entree
+
+
+def charger_avec_cache(file_bytes, dossier=None):
+    """Nettoie un fichier importé (sauf s'il est déjà en cache) et renvoie sa clé de cache."""
+    cle = empreinte(file_bytes)
+    if not os.path.exists(chemin_cache(cle, dossier)):
+        ecrire_cache(cle, load_and_clean(file_bytes), dossier)
+    return cle
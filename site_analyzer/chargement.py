@@ -0,0 +1,315 @@
+# Chargement et nettoyage des fichiers de données de site
+
+import datetime as dt
+import io
+import unicodedata
+import warnings
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from site_analyzer.profilage import mesurer
+
+
+# Format attendu (cf. onglet "Indications")
+
+COLONNES = [
+    'date', 'heure',
+    'puissance_grid', 'puissance_ge', 'puissance_solaire', 'puissance_conso',
+    'energie_grid', 'energie_ge', 'energie_solaire', 'energie_solaire_theorique',
+    'energie_conso',
+    'statut_grid', 'statut_ge', 'statut_solaire', 'statut_installation'
+]
+
+COLS_NUMERIQUES = [
+    'puissance_grid', 'puissance_ge', 'puissance_solaire', 'puissance_conso',
+    'energie_grid', 'energie_ge', 'energie_solaire', 'energie_solaire_theorique',
+    'energie_conso'
+]
+
+COLS_PUISSANCE = ['puissance_grid', 'puissance_ge', 'puissance_solaire', 'puissance_conso']
+
+COLS_ENERGIE = [
+    'energie_grid', 'energie_ge', 'energie_solaire', 'energie_solaire_theorique',
+    'energie_conso'
+]
+
+COLS_STATUT = ['statut_grid', 'statut_ge', 'statut_solaire', 'statut_installation']
+
+# Vocabulaires connus des colonnes de statut ("?" = valeur absente)
+VOCABULAIRES_STATUT = {
+    'statut_grid': ['on', 'off'],
+    'statut_ge': ['eteint', 'normal', 'sous-regime'],
+    'statut_solaire': ['critique', 'mauvais', 'tolerable', 'excellent'],
+    'statut_installation': ['panne nea', 'ecretage client', 'ras'],
+}
+
+# Lecture des CSV par blocs, avec des types compacts dès le parsing
+TAILLE_BLOC_CSV = 50_000
+
+DTYPES_CSV = dict(
+    {col: 'category' for col in ['date', 'heure'] + COLS_STATUT},
+    **{col: 'float32' for col in COLS_NUMERIQUES}
+)
+
+# Variantes d'écriture rencontrées dans les exports
+ALIAS_STATUT = {
+    'sous regime': 'sous-regime',
+    'mauvaise': 'mauvais',
+}
+
+
+class FormatFichierError(ValueError):
+    """Le fichier importé ne respecte pas le format attendu."""
+
+
+def clean_statut(x):
+    if pd.isna(x) or str(x).strip()=="":
+        return "?" 
+    x_sans_accent = unicodedata.normalize('NFKD', str(x)).encode('ASCII', 'ignore').decode('utf-8')
+    return x_sans_accent.strip().lower()
+
+
+def normaliser_statut(serie, vocabulaire):
+    """Normalise une colonne de statut et la renvoie sous forme de Categorical.
+
+    ``clean_statut`` n'est appliquée qu'une fois par valeur distincte, puis le
+    résultat est redistribué sur toutes les lignes via les codes de factorisation.
+    Les libellés hors vocabulaire sont conservés comme catégories supplémentaires.
+    """
+    codes, uniques = pd.factorize(serie)
+    valeurs = [clean_statut(v) for v in uniques]
+    valeurs = [ALIAS_STATUT.get(v, v) for v in valeurs]
+
+    categories = list(vocabulaire) + ["?"]
+    categories += sorted(set(valeurs) - set(categories))
+    position = {c: i for i, c in enumerate(categories)}
+
+    # Le code -1 (valeur manquante) pointe sur le dernier élément : "?"
+    table = np.array([position[v] for v in valeurs] + [position["?"]], dtype=np.int16)
+    return pd.Series(
+        pd.Categorical.from_codes(table[codes], categories=categories),
+        index=serie.index, name=serie.name
+    )
+
+
+def _en_jours(date):
+    # Colonne date -> datetime64 à minuit
+    if pd.api.types.is_datetime64_any_dtype(date):
+        return date.dt.normalize().to_numpy()
+
+    # Peu de dates distinctes : seules les valeurs uniques sont analysées
+    codes, uniques = pd.factorize(date)
+    if all(isinstance(v, str) for v in uniques):
+        jours = pd.to_datetime(pd.Index(uniques).str.strip(), format='%Y-%m-%d')
+    else:
+        jours = pd.to_datetime(pd.Index(uniques, dtype=object)).normalize()
+    table = np.append(jours.to_numpy(), np.datetime64("NaT"))
+    return table[codes]
+
+
+def _texte_heure(v):
+    # Heure unique -> texte "HH:MM:SS" (accepte "HH:MM" et les objets time/datetime)
+    if isinstance(v, (dt.time, dt.datetime)):
+        return v.strftime("%H:%M:%S")
+    texte = str(v).strip()
+    if texte.count(":") == 1:
+        texte += ":00"
+    return texte
+
+
+def _en_durees(heure):
+    # Colonne heure -> timedelta64 depuis minuit
+    if pd.api.types.is_timedelta64_dtype(heure):
+        return heure.to_numpy()
+    if pd.api.types.is_datetime64_any_dtype(heure):
+        return (heure - heure.dt.normalize()).to_numpy()
+    if pd.api.types.is_numeric_dtype(heure):
+        # Heure Excel exprimée en fraction de jour
+        return pd.to_timedelta(heure, unit='D').to_numpy()
+
+    # Au plus quelques centaines d'heures distinctes (pas de 10 min)
+    codes, uniques = pd.factorize(heure)
+    durees = pd.to_timedelta([_texte_heure(v) for v in uniques])
+    table = np.append(durees.to_numpy(), np.timedelta64("NaT"))
+    return table[codes]
+
+
+def construire_datetime(date, heure):
+    """Fusionne les colonnes date et heure en une colonne datetime64.
+
+    Les deux colonnes sont converties selon leur type (texte, objets date/time
+    issus d'Excel, datetime64, timedelta64) puis additionnées directement,
+    sans passer par une chaîne intermédiaire "date heure".
+    """
+    valeurs = _en_jours(date) + _en_durees(heure)
+    return pd.Series(valeurs, index=date.index, name='datetime')
+
+
+def est_fichier_excel(file_bytes):
+    # Les fichiers .xlsx / .xlsm sont des archives zip
+    return file_bytes[:4] == b"PK\x03\x04"
+
+
+def _concatener_blocs(blocs):
+    # Les catégories diffèrent d'un bloc à l'autre : union explicite pour ne pas
+    # retomber sur des colonnes objet (pd.concat) lors de l'assemblage
+    if len(blocs) == 1:
+        return blocs[0]
+
+    colonnes = {}
+    for col in blocs[0].columns:
+        series = [bloc[col] for bloc in blocs]
+        if isinstance(series[0].dtype, pd.CategoricalDtype):
+            # Un bloc sans aucune valeur (statut vide) a des catégories de type objet :
+            # toutes sont ramenées au type texte, exigé par union_categoricals
+            series = [serie.cat.set_categories(serie.cat.categories.astype('str')) for serie in series]
+            colonnes[col] = union_categoricals(series)
+        else:
+            colonnes[col] = np.concatenate([serie.to_numpy() for serie in series])
+    return pd.DataFrame(colonnes)
+
+
+def _blocs_verifies(lecteur):
+    try:
+        yield from lecteur
+    except (pd.errors.ParserError, pd.errors.ParserWarning) as e:
+        raise FormatFichierError(f"Le fichier contient des lignes de plus de {len(COLONNES)} colonnes.") from e
+
+
+def _lire_blocs_csv(file_bytes, taille_bloc, dtypes, entete=True):
+    # Blocs lus et nombre de valeurs non numériques remplacées par NaN, par colonne
+    blocs = []
+    invalides = dict.fromkeys(COLS_NUMERIQUES, 0)
+    lecteur = pd.read_csv(
+        io.BytesIO(file_bytes), header=0 if entete else None, names=COLONNES, index_col=False,
+        dtype=dtypes, chunksize=taille_bloc, on_bad_lines="error"
+    )
+    # Ligne de plus de 15 champs : erreur de lecture, ou simple avertissement (données
+    # tronquées) si elle ouvre un bloc ; les deux cas sont rejetés
+    with lecteur, warnings.catch_warnings():
+        warnings.simplefilter("error", pd.errors.ParserWarning)
+        for bloc in _blocs_verifies(lecteur):
+            # Colonnes lues en texte (mode dégradé) : conversion bloc par bloc
+            for col in COLS_NUMERIQUES:
+                if bloc[col].dtype != np.float32:
+                    valeurs = pd.to_numeric(bloc[col], errors='coerce').astype(np.float32)
+                    invalides[col] += int((valeurs.isna() & bloc[col].notna()).sum())
+                    bloc[col] = valeurs
+            blocs.append(bloc)
+    return blocs, invalides
+
+
+def lire_csv(file_bytes, taille_bloc=TAILLE_BLOC_CSV, entete=True):
+    """Lit un CSV par blocs avec des types compacts (float32, category).
+
+    Le format (15 colonnes) est vérifié sur l'en-tête avant toute lecture des
+    données : un fichier mal formé est rejeté sans être chargé en mémoire.
+    ``entete=False`` lit un fragment sans ligne d'en-tête (lignes ajoutées à un fichier connu).
+    """
+    if entete:
+        colonnes = pd.read_csv(io.BytesIO(file_bytes), nrows=0)
+        if colonnes.shape[1] != len(COLONNES):
+            raise FormatFichierError(f"Le fichier contient {colonnes.shape[1]} colonnes au lieu de {len(COLONNES)}.")
+
+    try:
+        blocs, invalides = _lire_blocs_csv(file_bytes, taille_bloc, DTYPES_CSV, entete)
+    except FormatFichierError:
+        raise
+    except ValueError:
+        # Valeurs numériques invalides : relecture en texte, ces valeurs deviennent NaN
+        # comme avec pd.to_numeric(errors='coerce')
+        dtypes = {col: dtype for col, dtype in DTYPES_CSV.items() if col not in COLS_NUMERIQUES}
+        blocs, invalides = _lire_blocs_csv(file_bytes, taille_bloc, dtypes, entete)
+
+    if not blocs:
+        return pd.DataFrame({col: pd.Series(dtype=DTYPES_CSV[col]) for col in COLONNES})
+    df = _concatener_blocs(blocs)
+    # Comptes repris par nettoyer_donnees (les colonnes sont déjà converties)
+    df.attrs['valeurs_invalides'] = invalides
+    return df
+
+
+def lire_fichier(file_bytes):
+    if not est_fichier_excel(file_bytes):
+        return lire_csv(file_bytes)
+
+    df = pd.read_excel(io.BytesIO(file_bytes))
+
+    if df.shape[1] != len(COLONNES):
+        raise FormatFichierError(f"Le fichier contient {df.shape[1]} colonnes au lieu de {len(COLONNES)}.")
+    return df
+
+
+def nettoyer_donnees(df):
+    """Construit le DataFrame d'analyse à partir des 15 colonnes brutes.
+
+    Plan mémoire : index ``datetime`` trié, mesures en float32, statuts en
+    Categorical ; les colonnes texte date / heure ne sont pas conservées.
+    ``attrs['valeurs_invalides']`` : nombre de valeurs non numériques remplacées
+    par NaN, par colonne (cf. ``qualite.controler_qualite``).
+    """
+    brut = df.set_axis(COLONNES, axis=1)
+
+    # 1. Index datetime (fusion date + heure)
+    index = pd.DatetimeIndex(construire_datetime(brut['date'], brut['heure']), name='datetime')
+
+    # 2. Conversion des colonnes numériques en float32
+    colonnes = {}
+    invalides = dict(brut.attrs.get('valeurs_invalides', {}))
+    for col in COLS_NUMERIQUES:
+        colonnes[col] = pd.to_numeric(brut[col], errors='coerce').to_numpy(dtype=np.float32)
+        # Valeurs présentes dans le fichier mais non convertibles
+        invalides[col] = invalides.get(col, 0) + int((np.isnan(colonnes[col]) & brut[col].notna().to_numpy()).sum())
+
+    # 3. Nettoyage des colonnes de statut
+    for col in COLS_STATUT:
+        colonnes[col] = normaliser_statut(brut[col], VOCABULAIRES_STATUT[col]).array
+
+    # 4. Tri chronologique de l'index
+    df = pd.DataFrame(colonnes, index=index).sort_index(kind='stable')
+    df.attrs['valeurs_invalides'] = invalides
+    return df
+
+
+def concatener_donnees(frames):
+    """Concatène des DataFrames nettoyés en gardant les statuts en Categorical.
+
+    Les catégories de statut sont d'abord alignées (ordre de première apparition),
+    sinon pd.concat convertirait les colonnes en objets. Les comptes de valeurs
+    invalides sont additionnés (absents si l'un des DataFrames n'en a pas).
+    """
+    frames = list(frames)
+    comptes = [df.attrs.get('valeurs_invalides') for df in frames]
+    for col in COLS_STATUT:
+        categories = []
+        for df in frames:
+            categories += [c for c in df[col].cat.categories if c not in categories]
+        frames = [df.assign(**{col: df[col].cat.set_categories(categories)}) for df in frames]
+
+    resultat = pd.concat(frames)
+    resultat.attrs = {}
+    if comptes and None not in comptes:
+        resultat.attrs['valeurs_invalides'] = {col: sum(c.get(col, 0) for c in comptes) for col in COLS_NUMERIQUES}
+    return resultat
+
+
+def octets_par_ligne(df):
+    # Empreinte mémoire réelle (chaînes comprises), index inclus
+    if len(df) == 0:
+        return 0.0
+    return df.memory_usage(index=True, deep=True).sum() / len(df)
+
+
+def load_and_clean(file_bytes):
+    """Lit un fichier de données (CSV ou Excel) et renvoie le DataFrame nettoyé.
+
+    Le résultat ne dépend que du contenu du fichier : la fonction peut donc être
+    mise en cache par empreinte de contenu (voir ``cache.charger_avec_cache``).
+    """
+    with mesurer("lecture_fichier") as mesure:
+        brut = lire_fichier(file_bytes)
+        mesure.lignes = len(brut)
+    with mesurer("nettoyage", lignes=len(brut)):
+        return nettoyer_donnees(brut)
@@ -0,0 +1,56 @@
+# Interface en ligne de commande : site-analyzer batch ...
+
+import argparse
+import os
+import sys
+
+from site_analyzer.batch import generer_lot, lire_periode
+
+
+def commande_batch(args):
+    try:
+        periodes = [lire_periode(texte) for texte in args.periode]
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+    if not os.path.isdir(args.dossier):
+        print(f"❌ Dossier introuvable : {args.dossier}", file=sys.stderr)
+        return 2
+
+    resultats = generer_lot(args.dossier, periodes, args.sortie, processus=args.processus)
+    if not resultats:
+        print(f"❌ Aucun fichier de données (.csv, .xlsx) dans {args.dossier}", file=sys.stderr)
+        return 1
+
+    code = 0
+    for chemin, resultat in resultats.items():
+        site = os.path.splitext(os.path.basename(chemin))[0]
+        if isinstance(resultat, Exception):
+            print(f"❌ {site} : {resultat}")
+            code = 1
+            continue
+        for (date_debut, date_fin), chemin_rapport, message in resultat:
+            if chemin_rapport:
+                print(f"✅ {site} {date_debut} → {date_fin} : {chemin_rapport}")
+                if message != "ok":
+                    print(f"   ⚠️ {message}")
+            else:
+                print(f"⚠️ {site} {date_debut} → {date_fin} : {message}")
+    return code
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="site-analyzer", description="Site Analyzer sans interface")
+    commandes = parser.add_subparsers(dest="commande", required=True)
+
+    batch = commandes.add_parser("batch", help="rapports Word pour plusieurs sites et périodes")
+    batch.add_argument("dossier", help="dossier contenant un fichier de données (.csv / .xlsx) par site")
+    batch.add_argument("-p", "--periode", action="append", required=True,
+                       help='période "AAAA-MM" ou "AAAA-MM-JJ:AAAA-MM-JJ" (option répétable)')
+    batch.add_argument("-o", "--sortie", default="rapports", help="dossier des rapports générés")
+    batch.add_argument("-j", "--processus", type=int, default=None,
+                       help="nombre de sites traités en parallèle (par défaut : nombre de CPU)")
+    batch.set_defaults(fonction=commande_batch)
+
+    args = parser.parse_args(argv)
+    return args.fonction(args)
@@ -0,0 +1,48 @@
+# Sous-échantillonnage des séries longues avant affichage (préserve les pics)
+
+import os
+
+import numpy as np
+
+
+# Nombre maximal de points envoyés au navigateur par courbe
+BUDGET_POINTS = int(os.environ.get("SITE_ANALYZER_BUDGET_POINTS", 2000))
+
+# Au-delà de ce nombre de points, les courbes sont rendues en WebGL (Scattergl)
+SEUIL_WEBGL = 1000
+
+
+def indices_minmax(valeurs, budget=None):
+    """Positions à conserver pour afficher ``valeurs`` avec au plus ~``budget`` points.
+
+    La série est découpée en ``budget / 2`` paquets consécutifs dont on garde le
+    minimum et le maximum : les pics restent visibles quelle que soit la durée
+    affichée. La taille des paquets découle donc de la longueur de la période.
+    """
+    budget = budget or BUDGET_POINTS
+    n = len(valeurs)
+    if n <= budget:
+        return np.arange(n)
+
+    nb_paquets = max(budget // 2, 1)
+    taille = -(-n // nb_paquets)
+    complement = nb_paquets * taille - n
+
+    v = np.asarray(valeurs, dtype=np.float64)
+    manquant = np.isnan(v)
+    bas = np.concatenate([np.where(manquant, np.inf, v), np.full(complement, np.inf)])
+    haut = np.concatenate([np.where(manquant, -np.inf, v), np.full(complement, -np.inf)])
+
+    debuts = np.arange(nb_paquets) * taille
+    i_min = debuts + bas.reshape(nb_paquets, taille).argmin(axis=1)
+    i_max = debuts + haut.reshape(nb_paquets, taille).argmax(axis=1)
+
+    # Ordre chronologique, premier et dernier point toujours conservés
+    indices = np.unique(np.concatenate([i_min, i_max, [0, n - 1]]))
+    return indices[indices < n]
+
+
+def reduire_serie(x, y, budget=None):
+    # (x, y) sous-échantillonnés selon les extrema de y
+    indices = indices_minmax(y, budget)
+    return np.asarray(x)[indices], np.asarray(y)[indices]
@@ -0,0 +1,92 @@
+# Détection des épisodes (pannes, écrêtage, sous-régime) sur la série triée
+
+import numpy as np
+import pandas as pd
+
+
+# Type d'événement -> (colonne de statut, statut)
+TYPES_EVENEMENTS = {
+    'Panne NEA': ('statut_installation', 'panne nea'),
+    'Écrêtage client': ('statut_installation', 'ecretage client'),
+    'GE en sous-régime': ('statut_ge', 'sous-regime'),
+}
+
+# Écart maximal entre deux lignes d'un même épisode (en pas d'échantillonnage) :
+# au-delà, le trou de données termine l'épisode
+ECART_MAX_PAS = 1.5
+
+COLONNES_EVENEMENTS = ['type', 'debut', 'fin', 'nb_lignes', 'duree_h', 'energie_solaire_perdue']
+
+
+def _episodes(masque, coupure):
+    # Bornes [debut, fin] (positions incluses) des suites de True ;
+    # coupure[i] : trou de données entre les lignes i et i + 1
+    suite_avant = np.r_[False, masque[:-1] & ~coupure]
+    suite_apres = np.r_[masque[1:] & ~coupure, False]
+    return np.flatnonzero(masque & ~suite_avant), np.flatnonzero(masque & ~suite_apres)
+
+
+def detecter_evenements(df, pas_minutes, types=None):
+    """Épisodes contigus de chaque type d'événement, avec début, fin, durée et énergie solaire perdue.
+
+    Détection vectorisée (différences et sommes cumulées, sans boucle sur les
+    lignes) : ``energie_solaire_perdue`` (kWh) est la somme de
+    ``energie_solaire_theorique - energie_solaire`` sur l'épisode.
+    """
+    types = types or TYPES_EVENEMENTS
+    if len(df) == 0:
+        return pd.DataFrame(columns=COLONNES_EVENEMENTS)
+
+    pas = pd.Timedelta(minutes=pas_minutes)
+    horodatages = df.index.to_numpy()
+    coupure = np.diff(horodatages) > ECART_MAX_PAS * pas.to_timedelta64()
+
+    pertes = (df['energie_solaire_theorique'].to_numpy(dtype=np.float64)
+              - df['energie_solaire'].to_numpy(dtype=np.float64))
+    pertes_cumulees = np.r_[0.0, np.nancumsum(pertes)]
+
+    resultats = []
+    for nom, (colonne, statut) in types.items():
+        categories = df[colonne].cat.categories
+        if statut not in categories:
+            continue
+        debuts, fins = _episodes(df[colonne].array.codes == categories.get_loc(statut), coupure)
+        resultats.append(pd.DataFrame({
+            'type': nom,
+            'debut': horodatages[debuts],
+            'fin': horodatages[fins] + pas.to_timedelta64(),
+            'nb_lignes': fins - debuts + 1,
+            'energie_solaire_perdue': pertes_cumulees[fins + 1] - pertes_cumulees[debuts],
+        }))
+
+    if not resultats:
+        return pd.DataFrame(columns=COLONNES_EVENEMENTS)
+    evenements = pd.concat(resultats, ignore_index=True)
+    evenements['duree_h'] = (evenements['fin'] - evenements['debut']) / pd.Timedelta(hours=1)
+    return evenements[COLONNES_EVENEMENTS].sort_values('debut', kind='stable', ignore_index=True)
+
+
+def synthese_evenements(evenements):
+    # Nombre d'épisodes, durées et énergie perdue par type d'événement
+    synthese = evenements.groupby('type', sort=False).agg(
+        nombre=('debut', 'size'),
+        duree_totale_h=('duree_h', 'sum'),
+        duree_max_h=('duree_h', 'max'),
+        energie_solaire_perdue=('energie_solaire_perdue', 'sum'),
+    )
+    synthese = synthese.reindex([t for t in TYPES_EVENEMENTS if t in synthese.index])
+    synthese.columns = ["Nombre", "Durée totale (h)", "Durée max (h)", "Énergie solaire perdue (kWh)"]
+    return synthese.rename_axis("Événement").round(2)
+
+
+def tableau_evenements(evenements, nombre=None):
+    """Tableau d'affichage des épisodes ; ``nombre`` : seuls les plus longs sont conservés."""
+    if nombre is not None:
+        evenements = evenements.nlargest(nombre, 'duree_h').sort_values('debut', kind='stable')
+    return pd.DataFrame({
+        "Événement": evenements['type'],
+        "Début": evenements['debut'].dt.strftime("%Y-%m-%d %H:%M"),
+        "Fin": evenements['fin'].dt.strftime("%Y-%m-%d %H:%M"),
+        "Durée (h)": evenements['duree_h'].round(2),
+        "Énergie solaire perdue (kWh)": evenements['energie_solaire_perdue'].round(2),
+    })
@@ -0,0 +1,277 @@
+# Export des figures Plotly en PNG (rapport Word)
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import plotly.graph_objects as go
+
+from site_analyzer.echantillonnage import BUDGET_POINTS, SEUIL_WEBGL, reduire_serie
+
+
+journal = logging.getLogger(__name__)
+
+# Couleurs des sources et des états de l'installation
+COULEURS_SOURCES = {
+    "Grid": "#8B2A03",
+    "GE": "#003366",
+    "Solaire": "#FFA500",
+    "Installation globale": "#6B6767"
+}
+
+COULEURS_ETATS = {
+    "panne nea": "#D62728",           
+    "ecretage client": "#0F58DF",     
+    "ras": "#2CA02C",                 
+    "?": "#B0B0B0"   
+}
+
+# Paramètres de rendu kaleido
+LARGEUR_PNG = 900
+HAUTEUR_PNG = 600
+ECHELLE_PNG = 2
+
+# Nombre maximal d'images conservées en mémoire (les plus anciennes sont évincées)
+TAILLE_CACHE_PNG = 64
+
+_cache_png = OrderedDict()
+_verrou_cache = threading.Lock()
+
+
+def empreinte_figure(fig):
+    # Deux figures au JSON identique donnent la même image
+    contenu = f"{fig.to_json()}|{LARGEUR_PNG}x{HAUTEUR_PNG}@{ECHELLE_PNG}"
+    return hashlib.sha256(contenu.encode("utf-8")).hexdigest()
+
+
+def exporter_png(fig):
+    """Rend une figure Plotly en PNG (octets), ou None en cas d'échec.
+
+    Le rendu kaleido est écrit tel quel, sans repasser par matplotlib, et
+    mis en cache selon le contenu de la figure.
+    """
+    cle = empreinte_figure(fig)
+    with _verrou_cache:
+        if cle in _cache_png:
+            _cache_png.move_to_end(cle)
+            return _cache_png[cle]
+
+    try:
+        png = fig.to_image(format='png', width=LARGEUR_PNG, height=HAUTEUR_PNG, scale=ECHELLE_PNG)
+    except Exception as e:
+        # Première ligne seulement (les messages de kaleido s'étendent sur plusieurs lignes)
+        message = next((ligne.strip() for ligne in str(e).splitlines() if ligne.strip()), type(e).__name__)
+        journal.warning("Échec de l'export PNG de la figure : %s", message)
+        return None
+
+    with _verrou_cache:
+        _cache_png[cle] = png
+        while len(_cache_png) > TAILLE_CACHE_PNG:
+            _cache_png.popitem(last=False)
+    return png
+
+
+def vider_cache_png():
+    with _verrou_cache:
+        _cache_png.clear()
+
+
+def exporter_figures(figures, max_workers=4):
+    """Rend plusieurs figures en parallèle : ``{nom: fig}`` -> ``{nom: png ou None}``."""
+    if not figures:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(figures))) as pool:
+        resultats = pool.map(exporter_png, figures.values())
+        return dict(zip(figures.keys(), resultats))
+
+
+# Construction des figures (application et rapport)
+
+def figure_repartition_production(synthese):
+    # Camembert de la production par source
+    labels = ["Grid", "GE", "Solaire"]
+    values = [synthese.energies[source] for source in labels]
+    colors = [COULEURS_SOURCES[source] for source in labels]
+
+    fig = go.Figure(data=[go.Pie(
+        labels=labels,
+        values=values,
+        marker=dict(colors=colors),
+    )])
+    fig.update_layout(title_text="")
+    return fig
+
+
+def figure_repartition_etat(comptes):
+    # Camembert de l'état de l'installation globale (comptes : statut -> nombre de lignes)
+    repartition_etat = comptes[comptes > 0].sort_values(ascending=False).reset_index()
+    repartition_etat.columns = ["Statut", "Nombre"]
+
+    # Association d' une couleur à chaque statut présent
+    repartition_etat["Couleur"] = repartition_etat["Statut"].map(COULEURS_ETATS)
+
+    return go.Figure(
+        data=[
+            go.Pie(
+                labels=repartition_etat["Statut"],
+                values=repartition_etat["Nombre"],
+                marker=dict(colors=repartition_etat["Couleur"]),
+                textinfo="percent"
+            )
+        ]
+    )
+
+
+def figure_energie_solaire(heures_periode):
+    # Production solaire réelle vs théorique, groupée par heure de la journée (agrégats horaires)
+    df_energy_grouped = (
+        heures_periode.groupby(heures_periode.index.hour)[["energie_solaire", "energie_solaire_theorique"]].sum()
+        .rename_axis("heure").reset_index()
+    )
+    df_energy_grouped["heure"] = df_energy_grouped["heure"].map("{:02d}".format)
+
+    fig1 = go.Figure()
+
+    # Barres : énergie solaire réelle
+    fig1.add_trace(go.Bar(
+        x=df_energy_grouped["heure"],
+        y=df_energy_grouped["energie_solaire"],
+        name="E. solaire réelle (kWh)",
+        marker_color="#FFA500",
+        hovertemplate="Heure : %{x}<br>Energie solaire réelle : %{y:.2f} kWh<extra></extra>"
+    ))
+
+    # Courbe : énergie solaire théorique
+    fig1.add_trace(go.Scatter(
+        x=df_energy_grouped["heure"],
+        y=df_energy_grouped["energie_solaire_theorique"],
+        name="E. solaire théorique (kWh)",
+        mode="lines+markers",
+        line=dict(color="#EC0E0E", width=3),
+        hovertemplate="Heure : %{x}<br>Energie solaire théorique : %{y:.2f} kWh<extra></extra>"
+    ))
+
+    fig1.update_layout(
+        xaxis_title="Heure de la journée",
+        yaxis_title="Énergie (kWh)",
+        barmode="group",
+        template="simple_white",
+    )
+    return fig1
+
+
+def figure_energie_resolution(serie, resolution, budget=None):
+    """Production solaire réelle vs théorique au fil du temps (``serie`` : cf. ``resolutions.reechantillonner``).
+
+    Barres tant que le nombre de tranches reste dans le budget de points ; au-delà,
+    courbes sous-échantillonnées (min / max) pour ne pas saturer le navigateur.
+    """
+    budget = budget or BUDGET_POINTS
+    fig = go.Figure()
+
+    if len(serie) <= budget:
+        fig.add_trace(go.Bar(
+            x=serie.index,
+            y=serie["energie_solaire"],
+            name="E. solaire réelle (kWh)",
+            marker_color="#FFA500",
+            hovertemplate="%{x}<br>Energie solaire réelle : %{y:.2f} kWh<extra></extra>"
+        ))
+    else:
+        x_courbe, y_courbe = reduire_serie(serie.index, serie["energie_solaire"].to_numpy(), budget)
+        trace = go.Scattergl if len(x_courbe) > SEUIL_WEBGL else go.Scatter
+        fig.add_trace(trace(
+            x=x_courbe,
+            y=y_courbe,
+            name="E. solaire réelle (kWh)",
+            mode="lines",
+            line=dict(color="#FFA500"),
+            hovertemplate="%{x}<br>Energie solaire réelle : %{y:.2f} kWh<extra></extra>"
+        ))
+
+    x_courbe, y_courbe = reduire_serie(serie.index, serie["energie_solaire_theorique"].to_numpy(), budget)
+    trace = go.Scattergl if len(x_courbe) > SEUIL_WEBGL else go.Scatter
+    fig.add_trace(trace(
+        x=x_courbe,
+        y=y_courbe,
+        name="E. solaire théorique (kWh)",
+        mode="lines",
+        line=dict(color="#EC0E0E", width=2),
+        hovertemplate="%{x}<br>Energie solaire théorique : %{y:.2f} kWh<extra></extra>"
+    ))
+
+    fig.update_layout(
+        xaxis_title=f"Date (pas : {resolution.lower()})",
+        yaxis_title="Énergie (kWh)",
+        barmode="group",
+        template="simple_white",
+    )
+    return fig
+
+
+def _ajouter_courbes_puissance(fig, x, df, budget=None, maximum=False):
+    # Une courbe par source, sous-échantillonnée (min / max) au-delà du budget de points ;
+    # maximum=True : courbes des pics par tranche (colonnes pic_puissance_*)
+    for source, suffixe in [("Grid", "grid"), ("GE", "ge"), ("Solaire", "solaire"),
+                            ("Installation globale", "conso")]:
+        colonne = f"pic_puissance_{suffixe}" if maximum else f"puissance_{suffixe}"
+        x_courbe, y_courbe = reduire_serie(x, df[colonne].to_numpy(), budget)
+
+        ligne = dict(color=COULEURS_SOURCES[source])
+        if maximum:
+            ligne.update(dash="dot", width=1)
+        elif source == "Installation globale":
+            ligne["dash"] = "dash"
+
+        # Rendu WebGL pour les séries denses
+        trace = go.Scattergl if len(x_courbe) > SEUIL_WEBGL else go.Scatter
+        fig.add_trace(trace(
+            x=x_courbe,
+            y=y_courbe,
+            mode="lines",
+            name=f"{source} (max)" if maximum else source,
+            legendgroup=source,
+            line=ligne
+        ))
+
+
+def figure_puissance_jour(df_jour, budget=None):
+    # Courbes de puissance d'une journée, par source
+    fig2 = go.Figure()
+    _ajouter_courbes_puissance(fig2, df_jour.index.strftime("%H:%M"), df_jour, budget)
+
+    fig2.update_layout(
+        xaxis_title="Heure",
+        yaxis_title="Puissance (kW)",
+        template="simple_white",
+    )
+    return fig2
+
+
+def figure_puissance_resolution(serie, resolution, budget=None):
+    # Puissance moyenne (trait plein) et pic (pointillés) par tranche, par source
+    fig = go.Figure()
+    _ajouter_courbes_puissance(fig, serie.index, serie, budget)
+    _ajouter_courbes_puissance(fig, serie.index, serie, budget, maximum=True)
+
+    fig.update_layout(
+        xaxis_title=f"Date (pas : {resolution.lower()})",
+        yaxis_title="Puissance (kW)",
+        template="simple_white",
+    )
+    return fig
+
+
+def figure_puissance_periode(df_data, budget=None):
+    # Courbes de puissance sur toute la période (plusieurs jours à plusieurs années)
+    fig = go.Figure()
+    _ajouter_courbes_puissance(fig, df_data.index, df_data, budget)
+
+    fig.update_layout(
+        xaxis_title="Date",
+        yaxis_title="Puissance (kW)",
+        template="simple_white",
+    )
+    return fig
@@ -0,0 +1,119 @@
+# Flotte de sites : chargement parallèle et comparaison des KPIs de plusieurs sites
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from site_analyzer.agregation import COLS_MARCHE, PAS_DEFAUT_MIN, SOURCES
+from site_analyzer.cache import charger_avec_cache, chemin_cache, empreinte, lire_cache
+from site_analyzer.chargement import COLS_ENERGIE, COLS_PUISSANCE, concatener_donnees
+
+
+# Libellés d'affichage des KPIs de flotte
+LIBELLES_FLOTTE = {
+    'pic_puissance_conso': "Pic de puissance (kW)",
+    'energie_conso': "Énergie consommée (kWh)",
+    'energie_grid': "Énergie Grid (kWh)",
+    'energie_ge': "Énergie GE (kWh)",
+    'energie_solaire': "Énergie solaire réelle (kWh)",
+    'energie_solaire_theorique': "Énergie solaire théorique (kWh)",
+    'pertes_solaire': "Pertes solaires (kWh)",
+    'pertes_solaire_pct': "Pertes solaires (%)",
+    'heures_marche_grid': "Heures de marche Grid (h)",
+    'heures_marche_ge': "Heures de marche GE (h)",
+    'heures_marche_solaire': "Heures de marche Solaire (h)",
+    'part_panne_nea_pct': "Part panne nea (%)",
+}
+
+
+def nom_site(nom_fichier):
+    return os.path.splitext(os.path.basename(nom_fichier))[0]
+
+
+def charger_flotte(fichiers, processus=None):
+    """Nettoie et met en cache les fichiers de plusieurs sites : ``{site: octets}`` -> ``{site: clé}``.
+
+    Seuls les fichiers absents du cache disque sont analysés, en parallèle ;
+    les processus ne renvoient que la clé, les données étant relues depuis le cache.
+    """
+    cles = {site: empreinte(file_bytes) for site, file_bytes in fichiers.items()}
+    a_charger = [site for site, cle in cles.items() if not os.path.exists(chemin_cache(cle))]
+
+    if len(a_charger) == 1:
+        charger_avec_cache(fichiers[a_charger[0]])
+    elif a_charger:
+        with ProcessPoolExecutor(max_workers=processus) as pool:
+            list(pool.map(charger_avec_cache, [fichiers[site] for site in a_charger]))
+    return cles
+
+
+def assembler_flotte(cles):
+    """Assemble les données des sites en un seul DataFrame indexé par (site, datetime)."""
+    frames = {}
+    for site, cle in cles.items():
+        df = lire_cache(cle)
+        if df is None:
+            raise FileNotFoundError(f"Données du site {site} absentes du cache, fichier à recharger.")
+        frames[site] = df
+
+    # Mêmes catégories de statut pour tous les sites (cf. concatener_donnees)
+    flotte = concatener_donnees(frames.values())
+    sites = pd.Categorical.from_codes(
+        np.repeat(np.arange(len(frames)), [len(df) for df in frames.values()]),
+        categories=list(frames)
+    )
+    flotte.index = pd.MultiIndex.from_arrays([sites, flotte.index], names=['site', 'datetime'])
+    return flotte.sort_index()
+
+
+def pas_par_site(flotte):
+    # Écart médian entre horodatages successifs d'un même site (min), sans boucle sur les sites
+    sites = flotte.index.codes[0]
+    horodatages = flotte.index.get_level_values('datetime').to_numpy()
+
+    ecarts = np.diff(horodatages) / np.timedelta64(1, 'm')
+    valides = (sites[1:] == sites[:-1]) & (ecarts > 0)
+    pas = pd.Series(ecarts[valides]).groupby(sites[1:][valides]).median()
+
+    noms = flotte.index.levels[0]
+    return pd.Series(pas.values, index=noms[pas.index]).reindex(noms, fill_value=PAS_DEFAUT_MIN)
+
+
+def synthese_flotte(flotte, date_debut=None, date_fin=None):
+    """KPIs de production de chaque site en un seul groupby vectorisé (une ligne par site)."""
+    donnees = flotte
+    if date_debut is not None and date_fin is not None:
+        fin = pd.Timestamp(date_fin) + pd.Timedelta(days=1) - pd.Timedelta(microseconds=1)
+        donnees = flotte.loc[pd.IndexSlice[:, pd.Timestamp(date_debut):fin], :]
+
+    calcul = pd.DataFrame(
+        dict(
+            **{f'pic_{col}': donnees[col] for col in COLS_PUISSANCE},
+            **{col: donnees[col].astype('float64') for col in COLS_ENERGIE},
+            **{col.replace('puissance_', 'nb_marche_'): donnees[col] > 0 for col in COLS_MARCHE},
+            panne_nea=donnees['statut_installation'] == 'panne nea',
+        ),
+        index=donnees.index
+    )
+    reducteurs = {col: ('max' if col.startswith('pic_') else 'sum') for col in calcul.columns}
+    reducteurs['panne_nea'] = 'mean'
+
+    kpis = calcul.groupby(level='site', observed=True).agg(reducteurs).astype('float64')
+
+    pas = pas_par_site(flotte).reindex(kpis.index)
+    for suffixe in SOURCES.values():
+        if f'nb_marche_{suffixe}' in kpis:
+            kpis[f'heures_marche_{suffixe}'] = kpis.pop(f'nb_marche_{suffixe}') * pas / 60
+
+    kpis['pertes_solaire'] = kpis['energie_solaire_theorique'] - kpis['energie_solaire']
+    kpis['pertes_solaire_pct'] = 100 * kpis['pertes_solaire'] / kpis['energie_solaire_theorique'].replace(0, np.nan)
+    kpis['part_panne_nea_pct'] = 100 * kpis.pop('panne_nea')
+    return kpis
+
+
+def classement_flotte(kpis, critere='pertes_solaire', nombre=None):
+    # Sites classés du plus au moins concerné par le critère choisi
+    classement = kpis.sort_values(critere, ascending=False)
+    return classement if nombre is None else classement.head(nombre)
@@ -0,0 +1,94 @@
+# Import incrémental : seules les lignes ajoutées à un fichier déjà connu sont nettoyées
+
+import hashlib
+import json
+import os
+import re
+from dataclasses import dataclass
+
+import pandas as pd
+
+from site_analyzer.cache import DOSSIER_CACHE, chemin_cache, ecrire_cache, empreinte, lire_cache
+from site_analyzer.chargement import (
+    concatener_donnees, est_fichier_excel, load_and_clean, lire_csv, nettoyer_donnees
+)
+from site_analyzer.profilage import mesurer
+
+
+@dataclass
+class ResultatChargement:
+    cle: str
+    mode: str                       # 'cache', 'ajout' ou 'complet'
+    ancienne_cle: str = None
+    nouvelles_lignes: pd.DataFrame = None
+
+
+def chemin_manifeste(site, dossier=None):
+    nom = re.sub(r"[^\w.-]+", "_", site).strip("_") or "site"
+    return os.path.join(dossier or DOSSIER_CACHE, "manifestes", f"{nom}.json")
+
+
+def lire_manifeste(site, dossier=None):
+    try:
+        with open(chemin_manifeste(site, dossier), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def ecrire_manifeste(site, file_bytes, cle, df, dossier=None):
+    """Mémorise la taille et l'empreinte du dernier fichier importé pour ce site."""
+    chemin = chemin_manifeste(site, dossier)
+    os.makedirs(os.path.dirname(chemin), exist_ok=True)
+    manifeste = {
+        "taille": len(file_bytes),
+        "sha256": hashlib.sha256(file_bytes).hexdigest(),
+        "dernier_horodatage": df.index.max().isoformat() if len(df) else None,
+        "cle": cle,
+    }
+    chemin_tmp = f"{chemin}.tmp"
+    with open(chemin_tmp, "w", encoding="utf-8") as f:
+        json.dump(manifeste, f)
+    os.replace(chemin_tmp, chemin)
+
+
+def _est_ajout(file_bytes, manifeste):
+    # Le fichier précédent doit être un préfixe exact, terminé par une fin de ligne
+    taille = manifeste["taille"]
+    if est_fichier_excel(file_bytes) or len(file_bytes) <= taille:
+        return False
+    prefixe = file_bytes[:taille]
+    return prefixe.endswith(b"\n") and hashlib.sha256(prefixe).hexdigest() == manifeste["sha256"]
+
+
+def charger_incremental(site, file_bytes, dossier=None):
+    """Charge un fichier en ne traitant que les lignes ajoutées depuis le dernier import du site.
+
+    Retombe sur un nettoyage complet si le fichier n'est pas une extension
+    du précédent (fichier Excel, contenu modifié, entrée de cache évincée...).
+    """
+    cle = empreinte(file_bytes)
+    if os.path.exists(chemin_cache(cle, dossier)):
+        return ResultatChargement(cle, "cache")
+
+    manifeste = lire_manifeste(site, dossier) if site else None
+    ancien = None
+    if manifeste and _est_ajout(file_bytes, manifeste):
+        ancien = lire_cache(manifeste["cle"], dossier)
+
+    if ancien is None:
+        df = load_and_clean(file_bytes)
+        ecrire_cache(cle, df, dossier)
+        if site:
+            ecrire_manifeste(site, file_bytes, cle, df, dossier)
+        return ResultatChargement(cle, "complet")
+
+    with mesurer("lecture_ajout") as mesure:
+        nouvelles_lignes = nettoyer_donnees(lire_csv(file_bytes[manifeste["taille"]:], entete=False))
+        mesure.lignes = len(nouvelles_lignes)
+    df = concatener_donnees([ancien, nouvelles_lignes])
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index(kind="stable")
+    ecrire_cache(cle, df, dossier)
+    ecrire_manifeste(site, file_bytes, cle, df, dossier)
+    return ResultatChargement(cle, "ajout", manifeste["cle"], nouvelles_lignes)
@@ -0,0 +1,129 @@
+# Mesure des étapes de traitement : durée, lignes traitées et pic mémoire
+
+import datetime as dt
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+
+import pandas as pd
+
+
+# Mesures émises en JSON (une ligne par étape) sur ce journal ; si la variable
+# d'environnement est définie, elles sont aussi ajoutées au fichier indiqué
+journal = logging.getLogger("site_analyzer.profilage")
+
+FICHIER_JOURNAL = os.environ.get("SITE_ANALYZER_JOURNAL_PROFILAGE")
+if FICHIER_JOURNAL and not journal.handlers:
+    _sortie = logging.FileHandler(FICHIER_JOURNAL, encoding="utf-8")
+    _sortie.setFormatter(logging.Formatter("%(message)s"))
+    journal.addHandler(_sortie)
+    journal.setLevel(logging.INFO)
+
+# Collecte en cours (liste des mesures, suivi mémoire) et étapes ouvertes
+_collecte = ContextVar("collecte_mesures", default=None)
+_pile = ContextVar("pile_mesures", default=())
+
+# tracemalloc est global au processus : un seul thread à la fois mesure la
+# mémoire (ses étapes imbriquées partagent le suivi, compté par « profondeur »)
+_verrou_memoire = threading.Lock()
+_suivi_memoire = {"thread": None, "profondeur": 0, "demarre": False}
+
+
+@dataclass
+class Mesure:
+    etape: str
+    duree_s: float = 0.0
+    lignes: int = None
+    memoire_pic_mo: float = None
+
+
+def _reserver_memoire():
+    # True si le thread courant peut mesurer la mémoire (suivi libre ou déjà à lui)
+    with _verrou_memoire:
+        if _suivi_memoire["thread"] not in (None, threading.get_ident()):
+            return False
+        if _suivi_memoire["profondeur"] == 0:
+            _suivi_memoire["thread"] = threading.get_ident()
+            _suivi_memoire["demarre"] = not tracemalloc.is_tracing()
+            if _suivi_memoire["demarre"]:
+                tracemalloc.start()
+        _suivi_memoire["profondeur"] += 1
+        return True
+
+
+def _liberer_memoire():
+    with _verrou_memoire:
+        _suivi_memoire["profondeur"] -= 1
+        if _suivi_memoire["profondeur"] == 0:
+            if _suivi_memoire["demarre"]:
+                tracemalloc.stop()
+            _suivi_memoire.update(thread=None, demarre=False)
+
+
+@contextmanager
+def collecter(memoire=False):
+    """Rassemble les mesures de toutes les étapes exécutées dans le bloc.
+
+    ``memoire=True`` active tracemalloc pendant le bloc (coût non négligeable :
+    à réserver au diagnostic) ; un seul thread à la fois peut mesurer la mémoire.
+    """
+    mesures = []
+    jeton = _collecte.set((mesures, memoire))
+    try:
+        yield mesures
+    finally:
+        _collecte.reset(jeton)
+
+
+@contextmanager
+def mesurer(etape, lignes=None, mesures=None, memoire=None):
+    """Chronomètre une étape ; ``mesure.lignes`` peut être renseigné dans le bloc.
+
+    Sans liste ``mesures`` explicite, la mesure rejoint la collecte en cours.
+    Si un autre thread mesure déjà la mémoire, ``memoire_pic_mo`` reste None.
+    """
+    collecte = _collecte.get()
+    if mesures is None and collecte is not None:
+        mesures = collecte[0]
+    if memoire is None:
+        memoire = collecte is not None and collecte[1]
+
+    mesure = Mesure(etape, lignes=lignes)
+    memoire = memoire and _reserver_memoire()
+    if memoire:
+        courant, pic_parent = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+    # [pic observé dans les sous-étapes] : le reset_peak d'une sous-étape
+    # ne doit pas faire perdre le pic de l'étape englobante
+    suivi = [0]
+    jeton = _pile.set(_pile.get() + (suivi,))
+    debut = time.perf_counter()
+    try:
+        yield mesure
+    finally:
+        mesure.duree_s = time.perf_counter() - debut
+        _pile.reset(jeton)
+        if memoire:
+            pic = max(tracemalloc.get_traced_memory()[1], suivi[0])
+            mesure.memoire_pic_mo = (pic - courant) / 1024 ** 2
+            if _pile.get():
+                parent = _pile.get()[-1]
+                parent[0] = max(parent[0], pic, pic_parent)
+            _liberer_memoire()
+
+        if mesures is not None:
+            mesures.append(mesure)
+        journal.info(json.dumps({"horodatage": dt.datetime.now().isoformat(timespec="seconds"), **asdict(mesure)}))
+
+
+def tableau_mesures(mesures):
+    # Une ligne par étape, dans l'ordre de fin (sous-étapes avant l'étape englobante)
+    return pd.DataFrame(
+        [asdict(m) for m in mesures], columns=["etape", "duree_s", "lignes", "memoire_pic_mo"]
+    ).set_index("etape")
@@ -0,0 +1,172 @@
+# Contrôle qualité des données nettoyées : horodatages, valeurs numériques et statuts
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from site_analyzer.chargement import COLS_NUMERIQUES, COLS_STATUT, VOCABULAIRES_STATUT
+from site_analyzer.evenements import ECART_MAX_PAS
+
+
+# Puissance -> énergie de la même source (énergie attendue : puissance × pas)
+PAIRES_ENERGIE = {
+    'puissance_grid': 'energie_grid',
+    'puissance_ge': 'energie_ge',
+    'puissance_solaire': 'energie_solaire',
+    'puissance_conso': 'energie_conso',
+}
+
+# Écart toléré entre l'énergie d'une ligne et puissance × pas : relatif, avec un
+# plancher absolu (kWh) pour ne pas signaler les faibles valeurs
+TOLERANCE_ENERGIE = 0.25
+TOLERANCE_ENERGIE_KWH = 0.1
+
+
+@dataclass
+class ControleQualite:
+    """Anomalies détectées sur une période.
+
+    Horodatages : ``doublons`` (lignes en double), ``manquants`` (pas absents de
+    la grille déduite de ``pas_minutes``), ``trous`` (interruptions de plus de
+    ``ECART_MAX_PAS`` pas) et ``plus_long_trou_h``.
+    Par colonne numérique : ``invalides`` (valeurs non numériques remplacées par
+    NaN au nettoyage, sur tout le fichier importé ; None si inconnu), ``vides``,
+    ``negatives`` et ``incoherentes`` (énergie éloignée de puissance × pas).
+    ``statuts_inconnus`` : nombre de lignes par (colonne, libellé hors vocabulaire).
+    """
+    nb_lignes: int
+    pas_minutes: float
+    horodatages_invalides: int
+    doublons: int
+    manquants: int
+    trous: int
+    plus_long_trou_h: float
+    invalides: pd.Series
+    vides: pd.Series
+    negatives: pd.Series
+    incoherentes: pd.Series
+    statuts_inconnus: pd.Series
+
+    @property
+    def couverture(self):
+        # Part des horodatages attendus effectivement présents (%)
+        presents = self.nb_lignes - self.horodatages_invalides - self.doublons
+        attendus = presents + self.manquants
+        return 100 * presents / attendus if attendus else 100.0
+
+    @property
+    def nb_anomalies(self):
+        comptes = [self.horodatages_invalides, self.doublons, self.manquants,
+                   self.vides.sum(), self.negatives.sum(), self.incoherentes.sum(), self.statuts_inconnus.sum()]
+        if self.invalides is not None:
+            comptes.append(self.invalides.sum())
+        return int(sum(comptes))
+
+    def tableau_horodatages(self):
+        # Synthèse de la grille temporelle (affichage et rapport)
+        return pd.DataFrame({"Valeur": [
+            f"{self.nb_lignes}",
+            f"{self.pas_minutes:g}",
+            f"{self.horodatages_invalides}",
+            f"{self.doublons}",
+            f"{self.manquants}",
+            f"{self.trous}",
+            f"{self.plus_long_trou_h:.2f}",
+            f"{self.couverture:.2f}",
+        ]}, index=pd.Index([
+            "Lignes",
+            "Pas d'échantillonnage (min)",
+            "Horodatages invalides",
+            "Horodatages en double",
+            "Horodatages manquants",
+            "Trous de données",
+            "Plus long trou (h)",
+            "Couverture (%)",
+        ], name="Indicateur"))
+
+    def tableau_valeurs(self):
+        # Anomalies par colonne numérique (colonnes sans anomalie omises)
+        tableau = pd.DataFrame({
+            "Valeurs invalides (fichier)": self.invalides,
+            "Valeurs vides": self.vides,
+            "Valeurs négatives": self.negatives,
+            "Énergie ≠ puissance × pas": self.incoherentes,
+        }, index=pd.Index(COLS_NUMERIQUES, name="Colonne")).astype("Int64")
+        return tableau[tableau.fillna(0).sum(axis=1) > 0]
+
+    def tableau_statuts(self):
+        # Libellés de statut hors vocabulaire
+        return self.statuts_inconnus.rename("Lignes").reset_index()
+
+
+def _grille(index, pas_minutes, debut=None, fin=None):
+    # Doublons, pas manquants, trous et plus long trou (h) sur l'index trié ;
+    # [debut, fin) : bornes de la période, pour compter aussi les pas manquants aux extrémités
+    pas = np.timedelta64(int(round(pas_minutes * 60e9)), 'ns')
+    horodatages = index[index.notna()].to_numpy().astype('datetime64[ns]')
+    if debut is not None:
+        horodatages = np.r_[np.datetime64(pd.Timestamp(debut), 'ns') - pas, horodatages]
+    if fin is not None:
+        horodatages = np.r_[horodatages, np.datetime64(pd.Timestamp(fin), 'ns')]
+
+    ecarts = np.diff(horodatages)
+    doublons = int((ecarts == np.timedelta64(0, 'ns')).sum())
+    ecarts = ecarts[ecarts > np.timedelta64(0, 'ns')]
+    manquants = int(np.clip(np.rint(ecarts / pas) - 1, 0, None).sum())
+
+    ecarts_trous = ecarts[ecarts > ECART_MAX_PAS * pas]
+    plus_long = (ecarts_trous.max() - pas) / np.timedelta64(1, 'h') if len(ecarts_trous) else 0.0
+    return doublons, manquants, len(ecarts_trous), float(plus_long)
+
+
+def _statuts_inconnus(df):
+    comptes = {}
+    for col in COLS_STATUT:
+        statut = df[col].array
+        par_categorie = np.bincount(statut.codes[statut.codes >= 0], minlength=len(statut.categories))
+        connus = set(VOCABULAIRES_STATUT[col]) | {"?"}
+        for libelle, nombre in zip(statut.categories, par_categorie):
+            if libelle not in connus and nombre > 0:
+                comptes[(col, libelle)] = int(nombre)
+    index = pd.MultiIndex.from_tuples(list(comptes), names=["Colonne", "Libellé"]) if comptes else \
+        pd.MultiIndex.from_arrays([[], []], names=["Colonne", "Libellé"])
+    return pd.Series(list(comptes.values()), index=index, dtype=np.int64)
+
+
+def controler_qualite(df, pas_minutes, debut=None, fin=None):
+    """Contrôle qualité d'une période de données nettoyées, en un passage vectorisé.
+
+    ``debut`` / ``fin`` (exclue) : bornes de la période, pour compter les pas
+    manquants avant la première et après la dernière ligne. Les valeurs
+    invalides sont celles comptées au nettoyage (``df.attrs['valeurs_invalides']``).
+    """
+    valeurs = df[COLS_NUMERIQUES].to_numpy(dtype=np.float64)
+    vides = np.isnan(valeurs).sum(axis=0)
+    negatives = (valeurs < 0).sum(axis=0)
+
+    # Énergie de chaque ligne comparée à puissance × pas de la même source
+    puissances = df[list(PAIRES_ENERGIE)].to_numpy(dtype=np.float64)
+    energies = df[list(PAIRES_ENERGIE.values())].to_numpy(dtype=np.float64)
+    attendues = puissances * pas_minutes / 60
+    seuils = np.maximum(TOLERANCE_ENERGIE * np.maximum(np.abs(energies), np.abs(attendues)), TOLERANCE_ENERGIE_KWH)
+    incoherentes = pd.Series((np.abs(energies - attendues) > seuils).sum(axis=0),
+                             index=list(PAIRES_ENERGIE.values()))
+
+    invalides = df.attrs.get('valeurs_invalides')
+    doublons, manquants, trous, plus_long_trou_h = _grille(df.index, pas_minutes, debut, fin)
+
+    return ControleQualite(
+        nb_lignes=len(df),
+        pas_minutes=pas_minutes,
+        horodatages_invalides=int(df.index.isna().sum()),
+        doublons=doublons,
+        manquants=manquants,
+        trous=trous,
+        plus_long_trou_h=plus_long_trou_h,
+        invalides=pd.Series(invalides, dtype=np.int64).reindex(COLS_NUMERIQUES) if invalides is not None else None,
+        vides=pd.Series(vides, index=COLS_NUMERIQUES),
+        negatives=pd.Series(negatives, index=COLS_NUMERIQUES),
+        incoherentes=incoherentes.reindex(COLS_NUMERIQUES),
+        statuts_inconnus=_statuts_inconnus(df),
+    )
@@ -0,0 +1,243 @@
+# Éléments du rapport Word
+
+import os
+from io import BytesIO
+from xml.sax.saxutils import escape
+
+import pandas as pd
+from docx import Document
+from docx.enum.style import WD_STYLE_TYPE
+from docx.enum.table import WD_TABLE_ALIGNMENT
+from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls, qn
+from docx.shared import Inches, Pt, RGBColor
+
+from site_analyzer.evenements import synthese_evenements, tableau_evenements
+
+
+# Style de paragraphe partagé par toutes les cellules des tableaux
+STYLE_CELLULE = 'Cellule tableau'
+
+LARGEUR_COLONNE = Inches(1.75)
+
+# Épisodes détaillés dans le rapport (les plus longs de la période)
+NOMBRE_EVENEMENTS_RAPPORT = 15
+
+# Logo NEA fourni à la racine du projet
+LOGO_NEA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "logo_NEA.png")
+
+
+def style_cellule(doc):
+    # Police et alignement définis une fois dans un style, plutôt que sur chaque run
+    if STYLE_CELLULE in doc.styles:
+        return doc.styles[STYLE_CELLULE]
+
+    style = doc.styles.add_style(STYLE_CELLULE, WD_STYLE_TYPE.PARAGRAPH)
+    style.base_style = doc.styles['Normal']
+    style.font.name = 'Calibri'
+    style.font.size = Pt(10)
+    style.element.get_or_add_rPr().get_or_add_rFonts().set(qn('w:eastAsia'), 'Calibri')
+    style.paragraph_format.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+    return style
+
+
+def _texte_cellule(valeur):
+    return escape(str(valeur)) if pd.notna(valeur) else "—"
+
+
+def ajouter_tableau(doc, df, afficher_index=True):
+    """Ajoute un DataFrame au document sous forme de tableau centré.
+
+    Toutes les lignes sont générées en un seul fragment XML puis ajoutées au
+    tableau en bloc : le coût reste linéaire avec le nombre de lignes.
+    """
+    if afficher_index:
+        df = df.rename_axis(df.index.name if df.index.name is not None else "").reset_index()
+
+    table = doc.add_table(rows=0, cols=len(df.columns))
+    table.style = 'Table Grid'
+    table.alignment = WD_TABLE_ALIGNMENT.CENTER
+    table.autofit = True
+
+    style_id = style_cellule(doc).style_id
+    largeur = int(LARGEUR_COLONNE.twips)
+
+    def ligne_xml(valeurs):
+        cellules = "".join(
+            f'<w:tc><w:tcPr><w:tcW w:w="{largeur}" w:type="dxa"/></w:tcPr>'
+            f'<w:p><w:pPr><w:pStyle w:val="{style_id}"/></w:pPr>'
+            f'<w:r><w:t xml:space="preserve">{texte}</w:t></w:r></w:p></w:tc>'
+            for texte in valeurs
+        )
+        return f"<w:tr>{cellules}</w:tr>"
+
+    # Entête
+    lignes = [ligne_xml(escape(str(col)) for col in df.columns)]
+
+    # Données
+    for valeurs in df.itertuples(index=False, name=None):
+        lignes.append(ligne_xml(_texte_cellule(v) for v in valeurs))
+
+    fragment = parse_xml(f'<w:tbl {nsdecls("w")}>{"".join(lignes)}</w:tbl>')
+    table._tbl.extend(list(fragment))
+    return table
+
+
+def generer_rapport_word(site,date_debut, date_fin,date_jour,
+                          synthese_production,img_production, df_etat, img_etat,
+                          img1_evolution,img2_evolution,inclure_prod=True,inclure_etat=True, inclure_evolution=True,
+                          inclure_synthese_prod=True,inclure_repartition_prod=True, inclure_etat_dominant=True,inclure_etat_repartition=True,inclure_prod_solaire=True,inclure_prod_source=True,
+                          evenements=None,inclure_evenements=True,qualite=None,inclure_qualite=True,logo_path=None):
+    doc = Document()
+
+    def add_text_paragraph(text,bold=False, italic=False):
+        p = doc.add_paragraph()
+        run = p.add_run(text)
+        run.font.name = 'Calibri'
+        run.bold = bold
+        run.italic = italic
+        run._element.rPr.rFonts.set(qn('w:eastAsia'), 'Calibri')
+        run.font.color.rgb = RGBColor(0, 0, 0)
+
+    def add_heading2(text):
+        p = doc.add_heading(text, level=1)
+        run = p.runs[0]
+        run.font.size = Pt(16)
+        run.font.color.rgb = RGBColor(0, 51, 102)  # bleu foncé
+
+    
+    def add_centered_plotly_image(doc, image_png, width_in_inches=5):
+        p = doc.add_paragraph()
+        p.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+        run = p.add_run()
+        if not image_png:
+            run.add_text("[Erreur: figure absente]")
+            return
+        try:
+            # Image PNG insérée directement depuis la mémoire
+            run.add_picture(BytesIO(image_png), width=Inches(width_in_inches))
+        except Exception as e:
+            run.add_text(f"[Erreur: impossible d’ajouter le graphique – {e}]")
+                
+    # Logo en haut de page
+    if logo_path:
+        p_logo = doc.add_paragraph()
+        p_logo.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+        run_logo = p_logo.add_run()
+        run_logo.add_picture(logo_path, width=Inches(1))
+    
+    # Titre principal
+    titre = doc.add_heading(f"Rapport d'analyse {site}", 0)
+    titre.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+    run = titre.runs[0]
+    run.font.color.rgb = RGBColor(0, 0, 0)
+    run.font.bold = True
+
+    # Infos générales
+    add_text_paragraph(f"Période analysée : {date_debut} → {date_fin}")
+
+    # ========================
+    # 1 - PRODUCTION ENERGETIQUE
+    # ========================
+    if inclure_prod :
+        add_heading2("Production énergétique")
+     
+
+        if inclure_synthese_prod :
+            # Tableau de production
+            add_text_paragraph("Synthèse de production par source",bold=True)
+            ajouter_tableau(doc, synthese_production.tableau(), afficher_index=True)
+
+        if inclure_repartition_prod :
+            doc.add_paragraph()
+            # Graphe camembert
+            add_text_paragraph("Répartition de la production par source",bold=True)
+            add_centered_plotly_image(doc,img_production)
+        
+        doc.add_page_break()
+
+    # ========================
+    # 2 - ETAT DE FONCTIONNEMENT
+    # ========================
+
+    if inclure_etat :
+        add_heading2("État de fonctionnement")
+    
+
+        if inclure_etat_dominant:
+            # Tableau état dominant par source
+            add_text_paragraph("État dominant par source",bold=True)
+            ajouter_tableau(doc, df_etat, afficher_index=False)
+
+        if inclure_etat_repartition :
+            doc.add_paragraph()
+            # Graphe camembert
+            add_text_paragraph("Répartition de l’état de l’installation globale",bold=True)
+            add_centered_plotly_image(doc,img_etat)
+
+        if inclure_evenements and evenements is not None:
+            doc.add_paragraph()
+            # Épisodes de panne, d'écrêtage et de sous-régime
+            add_text_paragraph("Événements détectés",bold=True)
+            if evenements.empty:
+                add_text_paragraph("Aucun événement sur la période.",italic=True)
+            else:
+                ajouter_tableau(doc, synthese_evenements(evenements), afficher_index=True)
+                doc.add_paragraph()
+                add_text_paragraph(f"Épisodes les plus longs ({NOMBRE_EVENEMENTS_RAPPORT} au plus)",italic=True)
+                ajouter_tableau(doc, tableau_evenements(evenements, NOMBRE_EVENEMENTS_RAPPORT), afficher_index=False)
+        doc.add_page_break()
+
+    # ========================
+    # 3 - EVOLUTION TEMPORELLE
+    # ========================
+
+    if inclure_evolution :
+        
+        add_heading2("Évolution temporelle")
+     
+
+        if inclure_prod_solaire:
+
+            # Graphique production réelle vs théorique
+            add_text_paragraph("Production solaire réelle vs théorique (Energie)",bold=True)
+            add_centered_plotly_image(doc,img1_evolution)
+
+        if inclure_prod_source :
+            doc.add_paragraph()
+            # Graphique production quotidienne par source
+            add_text_paragraph("Production quotidienne par source (Puissance)",bold=True)
+            add_text_paragraph(f"Résultat du {date_jour}",italic=True)
+            add_centered_plotly_image(doc,img2_evolution)
+
+    # ========================
+    # 4 - QUALITE DES DONNEES
+    # ========================
+
+    if inclure_qualite and qualite is not None:
+        if inclure_evolution:
+            doc.add_page_break()
+
+        add_heading2("Qualité des données")
+
+        add_text_paragraph("Horodatages",bold=True)
+        ajouter_tableau(doc, qualite.tableau_horodatages(), afficher_index=True)
+
+        doc.add_paragraph()
+        add_text_paragraph("Valeurs numériques",bold=True)
+        tableau_valeurs = qualite.tableau_valeurs()
+        if tableau_valeurs.empty:
+            add_text_paragraph("Aucune valeur invalide, vide, négative ou incohérente sur la période.",italic=True)
+        else:
+            ajouter_tableau(doc, tableau_valeurs, afficher_index=True)
+
+        if not qualite.statuts_inconnus.empty:
+            doc.add_paragraph()
+            add_text_paragraph("Statuts hors vocabulaire",bold=True)
+            ajouter_tableau(doc, qualite.tableau_statuts(), afficher_index=False)
+
+    # Document enregistré en mémoire (aucun fichier temporaire sur le serveur)
+    buffer = BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
@@ -0,0 +1,101 @@
+# Séries d'énergie et de puissance à plusieurs résolutions (10 min à 1 mois)
+
+import numpy as np
+import pandas as pd
+
+from site_analyzer.chargement import COLS_ENERGIE, COLS_PUISSANCE
+
+
+# Résolution -> (unité numpy, unités par tranche, décalage) : le numéro de tranche
+# d'un horodatage est (unités depuis 1970 + décalage) // unités par tranche.
+# Semaines commençant le lundi : le 1er janvier 1970 est un jeudi
+RESOLUTIONS = {
+    '10 min': ('m', 10, 0),
+    'Heure': ('h', 1, 0),
+    'Jour': ('D', 1, 0),
+    'Semaine': ('D', 7, 3),
+    'Mois': ('M', 1, 0),
+}
+
+
+def numeros_tranches(index, resolution):
+    # Numéro entier de la tranche de chaque horodatage (croissant si l'index est trié)
+    unite, taille, decalage = RESOLUTIONS[resolution]
+    unites = index.to_numpy().astype(f'datetime64[{unite}]').astype(np.int64)
+    return (unites + decalage) // taille
+
+
+def debuts_tranches(numeros, resolution):
+    # Horodatage de début de chaque tranche
+    unite, taille, decalage = RESOLUTIONS[resolution]
+    debuts = (np.asarray(numeros) * taille - decalage).astype(f'datetime64[{unite}]')
+    return pd.DatetimeIndex(debuts.astype('datetime64[ns]'), name='datetime')
+
+
+def reechantillonner(df, resolution):
+    """Série de ``df`` (index trié) à la ``resolution`` demandée (clé de ``RESOLUTIONS``).
+
+    Une ligne par tranche non vide : ``nb_lignes``, ``energie_*`` (somme),
+    ``puissance_*`` (moyenne) et ``pic_puissance_*`` (max). Les tranches sont
+    numérotées par arithmétique entière sur l'index, puis réduites en un seul
+    passage (``reduceat``) sur les lignes contiguës de chaque tranche.
+    """
+    df = df[df.index.notna()]
+    if len(df) == 0:
+        colonnes = ['nb_lignes', *COLS_ENERGIE, *COLS_PUISSANCE, *(f'pic_{col}' for col in COLS_PUISSANCE)]
+        return pd.DataFrame(columns=colonnes, index=pd.DatetimeIndex([], name='datetime'), dtype='float64')
+
+    numeros = numeros_tranches(df.index, resolution)
+    debuts = np.flatnonzero(np.r_[True, numeros[1:] != numeros[:-1]])
+    nb_lignes = np.diff(np.r_[debuts, len(df)])
+
+    colonnes = {'nb_lignes': nb_lignes}
+    for col in COLS_ENERGIE:
+        valeurs = df[col].to_numpy(dtype=np.float64)
+        colonnes[col] = np.add.reduceat(np.nan_to_num(valeurs), debuts)
+
+    pics = {}
+    for col in COLS_PUISSANCE:
+        valeurs = df[col].to_numpy(dtype=np.float64)
+        presentes = np.add.reduceat(~np.isnan(valeurs), debuts)
+        sommes = np.add.reduceat(np.nan_to_num(valeurs), debuts)
+        colonnes[col] = np.divide(sommes, presentes, out=np.full(len(debuts), np.nan), where=presentes > 0)
+        # fmax ignore les valeurs manquantes (NaN seulement si toute la tranche l'est)
+        pics[f'pic_{col}'] = np.fmax.reduceat(valeurs, debuts)
+
+    return pd.DataFrame({**colonnes, **pics}, index=debuts_tranches(numeros[debuts], resolution))
+
+
+def decouper_serie(serie, df_periode, resolution):
+    """Tranches d'une période, à partir de la série du jeu de données complet.
+
+    Les tranches intérieures sont reprises de ``serie`` ; la première et la
+    dernière, qui peuvent déborder de la période (semaine, mois), sont
+    recalculées sur les seules lignes de ``df_periode``.
+    """
+    index = df_periode.index
+    if len(index) == 0:
+        return reechantillonner(df_periode, resolution)
+
+    premiere, derniere = numeros_tranches(index[[0, -1]], resolution)
+    if premiere == derniere:
+        return reechantillonner(df_periode, resolution)
+
+    debut_interieur, fin_interieur = debuts_tranches([premiere + 1, derniere], resolution)
+    tete = df_periode.iloc[:index.searchsorted(debut_interieur, side='left')]
+    queue = df_periode.iloc[index.searchsorted(fin_interieur, side='left'):]
+    interieur = serie.iloc[serie.index.searchsorted(debut_interieur, side='left'):
+                           serie.index.searchsorted(fin_interieur, side='left')]
+    return pd.concat([reechantillonner(tete, resolution), interieur, reechantillonner(queue, resolution)])
+
+
+def resolution_par_defaut(date_debut, date_fin):
+    # Résolution donnant un nombre de points lisible pour la période
+    jours = (date_fin - date_debut).days + 1
+    if jours <= 2:
+        return 'Heure'
+    if jours <= 62:
+        return 'Jour'
+    if jours <= 730:
+        return 'Semaine'
+    return 'Mois'
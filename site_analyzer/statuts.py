@@ -0,0 +1,90 @@
+# Analyse des statuts : matrice statut × source, états dominants, répartitions et durées
+
+import numpy as np
+import pandas as pd
+
+from site_analyzer.chargement import COLS_STATUT, VOCABULAIRES_STATUT
+
+
+# Libellé affiché -> colonne de statut de la source
+SOURCES_STATUT = {
+    'Grid': 'statut_grid',
+    'GE': 'statut_ge',
+    'Solaire': 'statut_solaire',
+    'Installation globale': 'statut_installation',
+}
+
+# États écartés pour l'état dominant : le GE est éteint la plupart du temps,
+# c'est son régime de marche qui est recherché
+ETATS_IGNORES_DOMINANT = {'GE': ['eteint']}
+
+
+def _etiquettes(categories_par_colonne):
+    # Vocabulaires dans l'ordre des sources, puis "?", puis libellés inconnus
+    etiquettes = [e for col in COLS_STATUT for e in VOCABULAIRES_STATUT[col]] + ["?"]
+    for categories in categories_par_colonne:
+        etiquettes += [c for c in categories if c not in etiquettes]
+    return list(dict.fromkeys(etiquettes))
+
+
+def matrice_depuis_agregats(statuts):
+    """Matrice statut × source (nombre de lignes), à partir d'une table de statuts agrégés.
+
+    ``statuts`` : sélection de ``Agregats.statuts_jours`` ou ``statuts_heures``
+    (comptes déjà calculés par bincount sur les codes catégoriels au chargement).
+    """
+    etiquettes = _etiquettes(statuts[col].columns for col in COLS_STATUT)
+    matrice = (statuts.sum().unstack(level=0)
+               .reindex(index=etiquettes, columns=list(SOURCES_STATUT.values()))
+               .fillna(0).astype(np.int64))
+    matrice.columns = list(SOURCES_STATUT)
+    return matrice.rename_axis('statut')
+
+
+def _dominant(comptes, source):
+    comptes = comptes.drop(ETATS_IGNORES_DOMINANT.get(source, []), errors='ignore')
+    # Égalité : premier libellé par ordre alphabétique (comme Series.mode)
+    comptes = comptes[comptes > 0].sort_index()
+    return comptes.idxmax() if len(comptes) else "?"
+
+
+def etats_dominants(matrice):
+    # Statut le plus fréquent par source ("?" si aucune ligne)
+    return pd.Series({source: _dominant(matrice[source], source) for source in matrice.columns})
+
+
+def tableau_etat_dominant(matrice):
+    # Tableau Source / Statut dominant (affichage et rapport)
+    dominants = etats_dominants(matrice)
+    return pd.DataFrame({"Source": dominants.index, "Statut dominant": dominants.to_numpy()})
+
+
+def etats_dominants_par_tranche(statuts):
+    """État dominant de chaque source pour chaque jour (ou heure) d'une table de statuts agrégés."""
+    colonnes = {}
+    for source, col in SOURCES_STATUT.items():
+        comptes = statuts[col].drop(columns=ETATS_IGNORES_DOMINANT.get(source, []), errors='ignore')
+        comptes = comptes.sort_index(axis=1)
+        colonnes[source] = comptes.idxmax(axis=1).where(comptes.sum(axis=1) > 0, "?")
+    return pd.DataFrame(colonnes)
+
+
+def repartition_statuts(matrice):
+    # Part de chaque statut par source (%)
+    return matrice / matrice.sum() * 100
+
+
+def durees_etats(matrice, pas_minutes):
+    # Temps passé dans chaque statut (h) : nombre de lignes × pas d'échantillonnage
+    return matrice * pas_minutes / 60
+
+
+def tableau_durees_etats(matrice, pas_minutes):
+    # Temps passé (h) et part (%) de chaque statut par source ; statuts jamais rencontrés omis
+    durees = durees_etats(matrice, pas_minutes)
+    parts = repartition_statuts(matrice)
+    colonnes = {}
+    for source in matrice.columns:
+        colonnes[f"{source} (h)"] = durees[source]
+        colonnes[f"{source} (%)"] = parts[source]
+    return pd.DataFrame(colonnes)[matrice.sum(axis=1) > 0]
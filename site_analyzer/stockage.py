@@ -0,0 +1,126 @@
+# Historique local des sites : Parquet partitionné par site et par mois
+
+import os
+import tempfile
+from urllib.parse import quote, unquote
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from site_analyzer.chargement import COLS_STATUT, VOCABULAIRES_STATUT, concatener_donnees
+
+
+DOSSIER_HISTORIQUE = os.environ.get(
+    "SITE_ANALYZER_HISTORIQUE_DIR",
+    os.path.join(os.path.expanduser("~"), ".local", "share", "site_analyzer", "historique")
+)
+
+# Lignes par groupe Parquet : les statistiques min / max de chaque groupe permettent
+# d'ignorer les groupes hors période à l'intérieur d'un fichier mensuel
+LIGNES_PAR_GROUPE = 4_464   # ~ un mois au pas de 10 minutes
+
+
+def dossier_site(site, dossier=None):
+    return os.path.join(dossier or DOSSIER_HISTORIQUE, f"site={quote(site, safe='')}")
+
+
+def chemin_partition(site, mois, dossier=None):
+    # Arborescence « hive » : site=<nom>/mois=<AAAA-MM>/donnees.parquet
+    return os.path.join(dossier_site(site, dossier), f"mois={mois}", "donnees.parquet")
+
+
+def _ecrire_partition(df, chemin):
+    os.makedirs(os.path.dirname(chemin), exist_ok=True)
+    fd, chemin_tmp = tempfile.mkstemp(dir=os.path.dirname(chemin), suffix=".tmp")
+    os.close(fd)
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=True)
+        pq.write_table(table, chemin_tmp, row_group_size=LIGNES_PAR_GROUPE)
+        os.replace(chemin_tmp, chemin)
+    finally:
+        if os.path.exists(chemin_tmp):
+            os.remove(chemin_tmp)
+
+
+def _categories_statut(df):
+    # Ordre des catégories identique à celui du nettoyage (vocabulaire, "?", puis libellés inconnus)
+    for col in COLS_STATUT:
+        categories = list(VOCABULAIRES_STATUT[col]) + ["?"]
+        categories += sorted(set(df[col].cat.categories) - set(categories))
+        df[col] = df[col].cat.set_categories(categories)
+    return df
+
+
+def enregistrer_site(site, df, dossier=None):
+    """Ajoute des données nettoyées à l'historique du site, mois par mois.
+
+    Les horodatages déjà présents sont remplacés par les nouvelles valeurs.
+    """
+    mois = df.index.strftime("%Y-%m")
+    for valeur, nouvelles in df.groupby(mois, sort=False, observed=True):
+        chemin = chemin_partition(site, valeur, dossier)
+        if os.path.exists(chemin):
+            anciennes = pd.read_parquet(chemin)
+            nouvelles = concatener_donnees([anciennes, nouvelles])
+            nouvelles = nouvelles[~nouvelles.index.duplicated(keep="last")]
+        _ecrire_partition(nouvelles.sort_index(kind="stable"), chemin)
+
+
+def sites_historique(dossier=None):
+    dossier = dossier or DOSSIER_HISTORIQUE
+    if not os.path.isdir(dossier):
+        return []
+    return sorted(unquote(nom.split("=", 1)[1]) for nom in os.listdir(dossier) if nom.startswith("site="))
+
+
+def _mois_site(site, dossier=None):
+    chemin = dossier_site(site, dossier)
+    if not os.path.isdir(chemin):
+        return []
+    return sorted(nom.split("=", 1)[1] for nom in os.listdir(chemin) if nom.startswith("mois="))
+
+
+def bornes_site(site, dossier=None):
+    """Premier et dernier horodatage enregistrés pour le site (seuls deux mois sont lus)."""
+    mois = _mois_site(site, dossier)
+    if not mois:
+        return None
+    premier = pq.read_table(chemin_partition(site, mois[0], dossier), columns=["datetime"])
+    dernier = pq.read_table(chemin_partition(site, mois[-1], dossier), columns=["datetime"])
+    return (pd.Timestamp(pc.min(premier["datetime"]).as_py()),
+            pd.Timestamp(pc.max(dernier["datetime"]).as_py()))
+
+
+def version_historique(site, dossier=None):
+    """Identifiant qui change à chaque écriture dans l'historique du site (dates de modification des mois)."""
+    return max((os.stat(chemin_partition(site, mois, dossier)).st_mtime_ns
+                for mois in _mois_site(site, dossier)), default=0)
+
+
+def lire_historique(site, date_debut, date_fin, dossier=None):
+    """Lit les données du site entre deux dates (incluses).
+
+    Le filtre est poussé jusqu'au jeu de données : seuls les mois concernés
+    sont ouverts, et seuls les groupes de lignes de la période y sont lus.
+    """
+    debut = pd.Timestamp(date_debut)
+    fin = pd.Timestamp(date_fin) + pd.Timedelta(days=1)
+    mois_fin = pd.Timestamp(date_fin).strftime("%Y-%m")
+
+    jeu = ds.dataset(dossier_site(site, dossier), format="parquet", partitioning="hive")
+    filtre = (
+        (ds.field("mois") >= debut.strftime("%Y-%m")) & (ds.field("mois") <= mois_fin)
+        & (ds.field("datetime") >= pa.scalar(debut, type=pa.timestamp("ns")))
+        & (ds.field("datetime") < pa.scalar(fin, type=pa.timestamp("ns")))
+    )
+    colonnes = [nom for nom in jeu.schema.names if nom != "mois"]
+    table = jeu.to_table(columns=colonnes, filter=filtre)
+
+    # Métadonnées pandas du fichier : l'index datetime est restauré directement.
+    # Les comptes de valeurs invalides d'un import ne valent pas pour l'historique
+    df = table.to_pandas()
+    df.attrs.clear()
+    return _categories_statut(df).sort_index(kind="stable")
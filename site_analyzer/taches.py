@@ -0,0 +1,89 @@
+# File de tâches en arrière-plan (génération des rapports sans bloquer la session)
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from site_analyzer.profilage import collecter
+
+
+@dataclass
+class Tache:
+    cle: str
+    description: str
+    etat: str = "en attente"        # 'en attente', 'en cours', 'terminée' ou 'erreur'
+    etape: str = ""
+    progression: float = 0.0
+    resultat: object = None
+    erreur: str = None
+    mesures: list = field(default_factory=list)     # étapes chronométrées pendant la tâche
+
+    @property
+    def finie(self):
+        return self.etat in ("terminée", "erreur")
+
+
+def cle_tache(**parametres):
+    # Deux demandes aux paramètres identiques partagent la même tâche (et son résultat)
+    contenu = json.dumps(parametres, sort_keys=True, default=str)
+    return hashlib.sha256(contenu.encode("utf-8")).hexdigest()
+
+
+class FileTaches:
+    """Pool de workers local ; les tâches terminées restent disponibles (les plus anciennes sont évincées).
+
+    La fonction soumise reçoit un argument ``progression(etape, fraction)``
+    pour publier son avancement. Les étapes qu'elle chronomètre (``mesurer``)
+    sont rassemblées dans ``Tache.mesures`` : la collecte de la session qui
+    soumet la tâche ne suit pas l'exécution dans le worker.
+    """
+
+    def __init__(self, max_workers=2, taille_cache=16):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tache")
+        self._taches = OrderedDict()
+        self._verrou = threading.Lock()
+        self.taille_cache = taille_cache
+
+    def soumettre(self, cle, fonction, *args, description="", memoire=False, **kwargs):
+        """Lance la tâche ``cle``, sauf si elle est déjà en cours ou terminée avec succès.
+
+        ``memoire=True`` mesure aussi le pic mémoire de chaque étape (cf. ``profilage.collecter``).
+        """
+        with self._verrou:
+            tache = self._taches.get(cle)
+            if tache is not None and tache.etat != "erreur":
+                self._taches.move_to_end(cle)
+                return tache
+
+            tache = Tache(cle, description)
+            self._taches[cle] = tache
+            self._evincer()
+
+        def progression(etape, fraction):
+            tache.etape, tache.progression = etape, fraction
+
+        def executer():
+            tache.etat = "en cours"
+            with collecter(memoire=memoire) as mesures:
+                tache.mesures = mesures
+                try:
+                    tache.resultat = fonction(*args, progression=progression, **kwargs)
+                    tache.etat, tache.etape, tache.progression = "terminée", "", 1.0
+                except Exception as e:
+                    tache.erreur, tache.etat = str(e), "erreur"
+
+        self._pool.submit(executer)
+        return tache
+
+    def tache(self, cle):
+        with self._verrou:
+            return self._taches.get(cle)
+
+    def _evincer(self):
+        # Seules les tâches finies sont évincées, jamais une tâche en cours
+        finies = [cle for cle, tache in self._taches.items() if tache.finie]
+        for cle in finies[:max(0, len(self._taches) - self.taille_cache)]:
+            del self._taches[cle]
@@ -0,0 +1,15 @@
+import pytest
+
+from benchmarks.generateur import en_octets, generer_site
+from site_analyzer.chargement import load_and_clean
+
+
+@pytest.fixture(scope="session")
+def octets_site():
+    # Fichier CSV synthétique de 10 jours (pas de 10 minutes)
+    return en_octets(generer_site(10), "csv")
+
+
+@pytest.fixture(scope="session")
+def donnees(octets_site):
+    return load_and_clean(octets_site)
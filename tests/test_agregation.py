@@ -0,0 +1,23 @@
+import pandas as pd
+import pytest
+
+from site_analyzer.agregation import construire_agregats, mettre_a_jour_agregats
+
+
+@pytest.mark.parametrize("coupure", [144 * 4, 144 * 4 + 3, 144 * 7 + 80])
+def test_mise_a_jour_incrementale(donnees, coupure):
+    # Ajout en fin de fichier, à une frontière de jour ou au milieu d'une heure :
+    # mêmes agrégats qu'une reconstruction complète
+    complets = construire_agregats(donnees)
+    incrementaux = mettre_a_jour_agregats(construire_agregats(donnees.iloc[:coupure]), donnees.iloc[coupure:])
+
+    for table in ["heures", "jours", "statuts_heures", "statuts_jours", "positions_jours"]:
+        attendue = getattr(complets, table)
+        obtenue = getattr(incrementaux, table)[attendue.columns]
+        pd.testing.assert_frame_equal(obtenue, attendue, check_dtype=False, check_freq=False)
+    assert incrementaux.pas_minutes == complets.pas_minutes
+
+
+def test_mise_a_jour_vide(donnees):
+    agregats = construire_agregats(donnees)
+    assert mettre_a_jour_agregats(agregats, donnees.iloc[:0]) is agregats
@@ -0,0 +1,49 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from site_analyzer.cache import (
+    charger_avec_cache, chemin_cache, ecrire_cache, empreinte, evincer, lire_cache
+)
+
+
+def test_aller_retour(donnees, tmp_path):
+    ecrire_cache("cle", donnees, tmp_path)
+    relu = lire_cache("cle", tmp_path)
+
+    pd.testing.assert_frame_equal(relu, donnees)
+    assert relu.attrs == donnees.attrs
+    # Lecture sans copie : les mesures restent des vues sur le fichier mappé
+    assert not relu["puissance_grid"].to_numpy().flags.writeable
+
+
+def test_entree_absente(tmp_path):
+    assert lire_cache("absente", tmp_path) is None
+
+
+def test_charger_avec_cache(octets_site, donnees, tmp_path):
+    cle = charger_avec_cache(octets_site, tmp_path)
+    assert cle == empreinte(octets_site)
+    pd.testing.assert_frame_equal(lire_cache(cle, tmp_path), donnees)
+
+    # Deuxième import du même fichier : l'entrée existante est reprise telle quelle
+    date = os.path.getmtime(chemin_cache(cle, tmp_path))
+    assert charger_avec_cache(octets_site, tmp_path) == cle
+    assert os.path.getmtime(chemin_cache(cle, tmp_path)) == date
+
+
+def test_eviction(tmp_path):
+    df = pd.DataFrame({"valeur": np.arange(100_000, dtype=np.float64)})
+    for age, cle in enumerate(["recente", "moyenne", "ancienne"]):
+        ecrire_cache(cle, df, tmp_path)
+        os.utime(chemin_cache(cle, tmp_path), (1e9 - age, 1e9 - age))
+    taille_mo = os.path.getsize(chemin_cache("recente", tmp_path)) / 1024 ** 2
+
+    # Place pour deux entrées : la moins récemment utilisée est supprimée
+    evincer(tmp_path, taille_max_mo=2.5 * taille_mo)
+    assert sorted(os.listdir(tmp_path)) == ["moyenne.feather", "recente.feather"]
+
+    # L'entrée à conserver survit même si elle est la plus ancienne
+    evincer(tmp_path, taille_max_mo=taille_mo, conserver="moyenne")
+    assert os.listdir(tmp_path) == ["moyenne.feather"]
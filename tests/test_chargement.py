@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.generateur import POINTS_PAR_JOUR, en_octets, generer_site
+from site_analyzer.chargement import (
+    TAILLE_BLOC_CSV, FormatFichierError, lire_csv, lire_fichier, nettoyer_donnees, normaliser_statut
+)
+
+
+def test_bloc_sans_statut():
+    # Premier bloc CSV entièrement sans statut d'installation (valeur vide autorisée)
+    brut = generer_site(-(-(TAILLE_BLOC_CSV + 10_000) // POINTS_PAR_JOUR))
+    brut["Statut Installation"] = brut["Statut Installation"].where(brut.index >= TAILLE_BLOC_CSV)
+    df = nettoyer_donnees(lire_fichier(en_octets(brut, "csv")))
+
+    assert len(df) == len(brut)
+    assert (df["statut_installation"].iloc[:TAILLE_BLOC_CSV] == "?").all()
+    assert isinstance(df["statut_installation"].dtype, pd.CategoricalDtype)
+
+
+@pytest.mark.parametrize("position", [1, 5])
+def test_ligne_trop_longue_rejetee(octets_site, position):
+    # Ligne de 16 champs, en tête de bloc ou non : rejetée plutôt que tronquée
+    lignes = octets_site.split(b"\n")
+    lignes[position] += b",99"
+    with pytest.raises(FormatFichierError):
+        lire_csv(b"\n".join(lignes), taille_bloc=5)
+
+
+def test_nombre_de_colonnes_rejete(octets_site):
+    lignes = octets_site.split(b"\n")
+    tronque = b"\n".join(ligne.rsplit(b",", 1)[0] for ligne in lignes if ligne)
+    with pytest.raises(FormatFichierError):
+        lire_fichier(tronque)
+
+
+def test_lecture_par_blocs_identique(octets_site):
+    # Le découpage en blocs ne change ni les valeurs, ni les statuts, ni les comptes d'invalides
+    lignes = octets_site.split(b"\n")
+    champs = lignes[7].split(b",")
+    champs[2] = b"abc"
+    lignes[7] = b",".join(champs)
+    contenu = b"\n".join(lignes)
+
+    entier = nettoyer_donnees(lire_csv(contenu, taille_bloc=10 ** 7))
+    par_blocs = nettoyer_donnees(lire_csv(contenu, taille_bloc=100))
+
+    pd.testing.assert_frame_equal(par_blocs, entier)
+    assert par_blocs.attrs["valeurs_invalides"] == entier.attrs["valeurs_invalides"]
+    assert entier.attrs["valeurs_invalides"]["puissance_grid"] == 1
+
+
+def test_normaliser_statut_alias():
+    serie = pd.Series(["Sous régime", "sous regime", " NORMAL ", None, "", "Éteint", "inconnu"])
+    statut = normaliser_statut(serie, ["eteint", "normal", "sous-regime"])
+
+    assert list(statut) == ["sous-regime", "sous-regime", "normal", "?", "?", "eteint", "inconnu"]
+    # Vocabulaire d'abord, puis "?", puis les libellés hors vocabulaire
+    assert list(statut.cat.categories) == ["eteint", "normal", "sous-regime", "?", "inconnu"]
+
+
+def test_normaliser_statut_mauvaise():
+    statut = normaliser_statut(pd.Series(["Mauvaise", "Tolérable"]), ["critique", "mauvais", "tolerable", "excellent"])
+    assert list(statut) == ["mauvais", "tolerable"]
+    assert np.array_equal(statut.cat.codes, [1, 2])
@@ -0,0 +1,32 @@
+import datetime as dt
+
+import pytest
+
+from site_analyzer.batch import generer_lot, lire_periode
+from site_analyzer.cli import main
+
+
+def test_lire_periode():
+    assert lire_periode("2024-02") == (dt.date(2024, 2, 1), dt.date(2024, 2, 29))
+    assert lire_periode("2024-03-05:2024-03-09") == (dt.date(2024, 3, 5), dt.date(2024, 3, 9))
+    with pytest.raises(ValueError):
+        lire_periode("2024-03-09:2024-03-05")
+
+
+def test_periode_invalide(tmp_path, capsys):
+    assert main(["batch", str(tmp_path), "-p", "2024-13"]) == 2
+    assert "❌" in capsys.readouterr().err
+
+
+def test_dossier_introuvable(tmp_path, capsys):
+    # Message d'erreur et code 2, sans créer le dossier de sortie
+    sortie = tmp_path / "rapports"
+    assert main(["batch", str(tmp_path / "absent"), "-p", "2024-08", "-o", str(sortie)]) == 2
+    assert "Dossier introuvable" in capsys.readouterr().err
+    assert not sortie.exists()
+
+
+def test_dossier_sans_fichier(tmp_path):
+    sortie = tmp_path / "rapports"
+    assert generer_lot(tmp_path, [lire_periode("2024-08")], sortie) == {}
+    assert not sortie.exists()
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+from site_analyzer.chargement import COLS_NUMERIQUES, COLS_STATUT, VOCABULAIRES_STATUT, normaliser_statut
+from site_analyzer.evenements import COLONNES_EVENEMENTS, TYPES_EVENEMENTS, detecter_evenements
+
+
+def _donnees(horodatages, installation, pertes):
+    index = pd.DatetimeIndex(pd.to_datetime(horodatages), name='datetime')
+    df = pd.DataFrame({col: np.zeros(len(index), dtype=np.float32) for col in COLS_NUMERIQUES}, index=index)
+    df['energie_solaire_theorique'] = np.asarray(pertes, dtype=np.float32)
+    statuts = {'statut_installation': installation}
+    for col in COLS_STATUT:
+        valeurs = pd.Series(statuts.get(col, ["?"] * len(index)), index=index)
+        df[col] = normaliser_statut(valeurs, VOCABULAIRES_STATUT[col])
+    return df
+
+
+def test_episodes_et_trous():
+    # Deux pannes séparées par une ligne RAS, puis une panne coupée par un trou de données
+    df = _donnees(
+        ["2024-01-01 00:00", "2024-01-01 00:10", "2024-01-01 00:20", "2024-01-01 00:30",
+         "2024-01-01 00:40", "2024-01-01 02:00", "2024-01-01 02:10"],
+        ["Panne NEA", "panne nea", "RAS", "panne nea", "panne nea", "panne nea", "ras"],
+        [1, 2, 4, 8, 16, 32, 64],
+    )
+    evenements = detecter_evenements(df, 10)
+
+    assert list(evenements.columns) == COLONNES_EVENEMENTS
+    assert (evenements['type'] == 'Panne NEA').all()
+    assert list(evenements['debut']) == list(pd.to_datetime(["2024-01-01 00:00", "2024-01-01 00:30", "2024-01-01 02:00"]))
+    assert list(evenements['fin']) == list(pd.to_datetime(["2024-01-01 00:20", "2024-01-01 00:50", "2024-01-01 02:10"]))
+    assert list(evenements['nb_lignes']) == [2, 2, 1]
+    assert list(evenements['energie_solaire_perdue']) == [3, 24, 32]
+    np.testing.assert_allclose(evenements['duree_h'], [1 / 3, 1 / 3, 1 / 6])
+
+
+def test_aucun_evenement():
+    df = _donnees(["2024-01-01 00:00", "2024-01-01 00:10"], ["ras", None], [0, 0])
+    assert detecter_evenements(df, 10).empty
+    assert detecter_evenements(df.iloc[:0], 10).empty
+
+
+def test_comme_boucle(donnees):
+    # Référence : parcours ligne à ligne des épisodes de chaque type
+    pas = pd.Timedelta(minutes=10)
+    attendus = []
+    for nom, (colonne, statut) in TYPES_EVENEMENTS.items():
+        episode = None
+        for (horodatage, ligne), precedent in zip(donnees.iterrows(), [None, *donnees.index[:-1]]):
+            continu = precedent is not None and horodatage - precedent <= 1.5 * pas
+            if ligne[colonne] == statut:
+                if episode is None or not continu:
+                    episode = [nom, horodatage, 0]
+                    attendus.append(episode)
+                episode[2] += 1
+            else:
+                episode = None
+
+    evenements = detecter_evenements(donnees, 10)
+    attendus = pd.DataFrame(attendus, columns=['type', 'debut', 'nb_lignes']).sort_values('debut', kind='stable')
+    assert len(evenements) == len(attendus) > 0
+    assert sorted(map(tuple, evenements[['type', 'debut', 'nb_lignes']].to_numpy().tolist())) == \
+        sorted(map(tuple, attendus.to_numpy().tolist()))
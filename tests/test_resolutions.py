@@ -0,0 +1,49 @@
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from site_analyzer.chargement import COLS_ENERGIE, COLS_PUISSANCE
+from site_analyzer.resolutions import decouper_serie, reechantillonner
+
+# Résolution -> règle de pandas.resample équivalente
+REGLES = {'10 min': '10min', 'Heure': 'h', 'Jour': 'D', 'Semaine': 'W-MON', 'Mois': 'MS'}
+
+
+@pytest.fixture(scope="module")
+def donnees_longues():
+    from benchmarks.generateur import en_octets, generer_site
+    from site_analyzer.chargement import load_and_clean
+
+    # Trous de données pour avoir des tranches vides à écarter
+    df = load_and_clean(en_octets(generer_site(80, debut="2024-01-03"), "csv"))
+    return df.drop(df.index[1000:1500]).drop(df.index[5000:9000])
+
+
+@pytest.mark.parametrize("resolution", list(REGLES))
+def test_reechantillonner_comme_resample(donnees_longues, resolution):
+    df = donnees_longues
+    regroupement = df.resample(REGLES[resolution], label='left', closed='left')
+    attendu = pd.concat([
+        regroupement.size().rename('nb_lignes'),
+        regroupement[COLS_ENERGIE].sum(),
+        regroupement[COLS_PUISSANCE].mean(),
+        regroupement[COLS_PUISSANCE].max().add_prefix('pic_'),
+    ], axis=1)
+    attendu = attendu[attendu['nb_lignes'] > 0]
+
+    obtenu = reechantillonner(df, resolution)
+    np.testing.assert_array_equal(obtenu.index, attendu.index)
+    pd.testing.assert_frame_equal(obtenu, attendu[obtenu.columns], check_dtype=False, check_freq=False,
+                                  check_index_type=False, rtol=1e-5)
+
+
+@pytest.mark.parametrize("resolution", ['Heure', 'Jour', 'Semaine', 'Mois'])
+def test_decouper_serie(donnees_longues, resolution):
+    # Période ne tombant pas sur les bornes des tranches
+    df = donnees_longues
+    serie = reechantillonner(df, resolution)
+    periode = df[(df.index >= dt.datetime(2024, 1, 17, 5, 30)) & (df.index < dt.datetime(2024, 3, 9, 14))]
+
+    pd.testing.assert_frame_equal(decouper_serie(serie, periode, resolution), reechantillonner(periode, resolution))
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from site_analyzer.agregation import construire_agregats
+from site_analyzer.statuts import (
+    ETATS_IGNORES_DOMINANT, SOURCES_STATUT, etats_dominants, etats_dominants_par_tranche,
+    matrice_depuis_agregats, repartition_statuts, tableau_durees_etats
+)
+
+
+def _mode(serie, source):
+    # Ancien calcul : valeur la plus fréquente des lignes brutes (Series.mode)
+    serie = serie.astype(str)
+    serie = serie[~serie.isin(ETATS_IGNORES_DOMINANT.get(source, []))]
+    mode = serie.mode()
+    return mode.iloc[0] if not mode.empty else "?"
+
+
+@pytest.fixture(scope="module")
+def agregats(donnees):
+    return construire_agregats(donnees)
+
+
+def test_matrice_comme_value_counts(donnees, agregats):
+    matrice = matrice_depuis_agregats(agregats.statuts_jours)
+    for source, col in SOURCES_STATUT.items():
+        comptes = donnees[col].astype(str).value_counts()
+        colonne = matrice[source]
+        pd.testing.assert_series_equal(colonne[colonne > 0].sort_index(), comptes.sort_index(),
+                                       check_names=False, check_index_type=False)
+
+
+def test_repartition_comme_value_counts(donnees, agregats):
+    repartition = repartition_statuts(matrice_depuis_agregats(agregats.statuts_jours))
+    for source, col in SOURCES_STATUT.items():
+        parts = donnees[col].astype(str).value_counts(normalize=True) * 100
+        np.testing.assert_allclose(repartition[source].reindex(parts.index), parts)
+        assert repartition[source].sum() == pytest.approx(100)
+
+
+def test_etats_dominants_comme_mode(donnees, agregats):
+    dominants = etats_dominants(matrice_depuis_agregats(agregats.statuts_jours))
+    for source, col in SOURCES_STATUT.items():
+        assert dominants[source] == _mode(donnees[col], source)
+
+
+def test_etats_dominants_par_jour_comme_mode(donnees, agregats):
+    dominants = etats_dominants_par_tranche(agregats.statuts_jours)
+    assert list(dominants.index) == list(agregats.jours.index)
+    for jour, lignes in donnees.groupby(donnees.index.normalize()):
+        for source, col in SOURCES_STATUT.items():
+            assert dominants.loc[jour, source] == _mode(lignes[col], source), (jour, source)
+
+
+def test_etat_dominant_ge_toujours_eteint(donnees):
+    # Jours où le GE n'a jamais tourné : aucun régime de marche, "?"
+    eteint = donnees.assign(statut_ge=donnees["statut_ge"].cat.categories.get_loc("eteint"))
+    eteint["statut_ge"] = pd.Categorical.from_codes(eteint["statut_ge"], donnees["statut_ge"].cat.categories)
+    dominants = etats_dominants_par_tranche(construire_agregats(eteint).statuts_jours)
+    assert (dominants["GE"] == "?").all()
+
+
+def test_tableau_durees_etats(agregats):
+    matrice = matrice_depuis_agregats(agregats.statuts_jours)
+    tableau = tableau_durees_etats(matrice, agregats.pas_minutes)
+
+    assert list(tableau.columns[:2]) == ["Grid (h)", "Grid (%)"]
+    assert tableau["Grid (h)"].sum() == pytest.approx(matrice["Grid"].sum() * agregats.pas_minutes / 60)
+    assert (matrice.loc[tableau.index].sum(axis=1) > 0).all()